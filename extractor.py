@@ -12,25 +12,48 @@ Architecture :
 
 API publique inchangée :
   - extraire_donnees_environnementales(texte_ocr) → ResultatExtraction
+  - batch_extraire(textes, workers=None) → List[ResultatExtraction]
   - ResultatExtraction.to_dict() / .to_json()
 """
 
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import sys
 import json
+import mmap
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Tuple, Iterator, Iterable, Mapping
 from datetime import datetime
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
+
+# RE2 (temps linéaire), alternances fusionnées, Aho–Corasick : partagés avec extractor_v1
+from pattern_utils import (
+    build_automaton as _build_automaton,
+    compile_linear as _compile_linear,
+    fuse_patterns as _fuse_patterns,
+    iter_by_pattern as _iter_by_pattern,
+    lower_is_faithful as _lower_is_faithful,
+    portable_atomic as _portable_atomic,
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  CONSTANTES & FACTEURS D'ÉMISSION
 # ═══════════════════════════════════════════════════════════════════════════════
 
-EMISSION_FACTORS: Dict[str, Dict[str, Any]] = {
+_EMISSION_FACTORS_RAW: Dict[str, Dict[str, Any]] = {
     "electricite": {
         "facteur_kg_co2_par_kwh": 0.475,
         "source": "ANME / IEA 2024 — mix électrique Tunisie",
@@ -64,8 +87,14 @@ EMISSION_FACTORS: Dict[str, Dict[str, Any]] = {
     },
 }
 
+# Tables figées en lecture seule : les automates et index construits à
+# l'import ne peuvent pas devenir obsolètes.
+EMISSION_FACTORS: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {k: MappingProxyType(v) for k, v in _EMISSION_FACTORS_RAW.items()}
+)
+
 # Mots-clés par type (FR + EN + AR)
-_TYPE_KEYWORDS: Dict[str, List[str]] = {
+_TYPE_KEYWORDS_RAW: Dict[str, List[str]] = {
     "electricite": [
         "steg", "électricité", "electricite", "electricity", "kwh", "kilowatt",
         "compteur électrique", "consommation electrique", "tarif electricite",
@@ -96,22 +125,353 @@ _TYPE_KEYWORDS: Dict[str, List[str]] = {
         "غاز مسال", "بوتان", "بروبان",
     ],
 }
+_TYPE_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {k: tuple(v) for k, v in _TYPE_KEYWORDS_RAW.items()}
+)
+
+# Fournisseurs connus : mots-clés + poids
+_FOURNISSEURS: Dict[str, Dict[str, Any]] = {
+    "STEG": {
+        "keywords": [
+            "steg",
+            "société tunisienne de l'électricité et du gaz",
+            "societe tunisienne de l electricite",
+            "société tunisienne du gaz",
+            "societe tunisienne du gaz",
+            "tunisienne du gaz",
+            "tunisienne de l'électricité",
+            "tunisienne de l electricite",
+            "الشركة التونسية للكهرباء",
+            "الشركة التونسية للكهرباء والغاز",
+            "للكهرباء والغاز",
+            "للهرباء",
+        ],
+        "weight": 1.0,
+    },
+    "SONEDE": {
+        "keywords": [
+            "eau",
+            "sonede",
+            "société nationale d'exploitation et de distribution des eaux",
+            "societe nationale d exploitation",
+            "distribution des eaux",
+            "الشركة الوطنية لاستغلال وتوزيع المياه",
+            "توزيع المياه",
+        ],
+        "weight": 1.0,
+    },
+    "EDF": {
+        "keywords": ["edf", "électricité de france", "electricite de france"],
+        "weight": 1.0,
+    },
+    "Engie": {
+        "keywords": ["engie"],
+        "weight": 1.0,
+    },
+    "TotalEnergies": {
+        "keywords": ["totalenergies", "total energies"],
+        "weight": 1.0,
+    },
+    "Shell": {
+        "keywords": ["shell energy", "shell"],
+        "weight": 0.8,
+    },
+}
+
+# Vue en tableau pour le scoring : (nom, mots-clés du plus long au plus court, poids)
+_FOURNISSEUR_ROWS: Tuple[Tuple[str, Tuple[str, ...], float], ...] = tuple(
+    (name, tuple(sorted(cfg["keywords"], key=len, reverse=True)), float(cfg["weight"]))
+    for name, cfg in _FOURNISSEURS.items()
+)
+# Texte plus court que le plus court mot-clé : aucun fournisseur possible
+_FOURNISSEUR_MIN_KW_LEN = min(len(kw) for _, kws, _ in _FOURNISSEUR_ROWS for kw in kws)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  LIBELLÉS & UNITÉS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Internés une fois : chaque DonneeEnvironnementale référence le même objet.
+_CHAMP_ENERGIE = sys.intern("Énergie consommée")
+_CHAMP_ENERGIE_ELEC = sys.intern("Énergie consommée (électricité)")
+_CHAMP_VOLUME_GAZ = sys.intern("Volume consommé (gaz)")
+_CHAMP_VOLUME_EAU = sys.intern("Volume consommé (eau)")
+_CHAMP_VOLUME_CARBURANT = sys.intern("Volume carburant")
+_CHAMP_MONTANT_PAYER = sys.intern("Montant à payer")
+_CHAMP_MONTANT_BULLETIN = sys.intern("Montant bulletin")
+_CHAMP_MONTANT_TOTAL_HT = sys.intern("Montant total HT")
+_CHAMP_SOUS_TOTAL_ELEC = sys.intern("Sous-total électricité")
+_CHAMP_SOUS_TOTAL_GAZ = sys.intern("Sous-total gaz")
+_CHAMP_SOUS_TOTAL_SERVICES = sys.intern("Sous-total services")
+
+_UNITE_KWH = sys.intern("kWh")
+_UNITE_M3 = sys.intern("m³")
+_UNITE_LITRES = sys.intern("litres")
+_UNITE_DT = sys.intern("DT")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  PATTERNS PRÉCOMPILÉS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Les patterns sans re.IGNORECASE s'appliquent à `texte_lower` (déjà en
+# minuscules) : le moteur n'a pas à replier la casse caractère par caractère.
+
+# ── Découpage en zones ──
+_RE_STEG_ELEC_ZONE = re.compile(
+    r'(electricit[ée].*?)(?=total\s*gaz|redevances?\s*fixes.*?gaz|\bgaz\b\s+redevance)',
+    re.IGNORECASE | re.DOTALL
+)
+_RE_STEG_GAZ_ZONE = re.compile(
+    r'(?:total\s*electricit[ée]|مجموع\s*الكهرباء)(.*?)(?:total\s*gaz|مجموع\s*الغاز|total\s*services)',
+    re.IGNORECASE | re.DOTALL
+)
+_RE_STEG_MONTANTS_ZONE = re.compile(
+    r'(montant\s*total.*?)(?:bulletin|versement|fermer|$)', re.IGNORECASE | re.DOTALL
+)
+_RE_STEG_PIED_ZONE = re.compile(r'(bulletin\s*de\s*versement.*)', re.IGNORECASE | re.DOTALL)
+_RE_STEG_TAXES_ZONE = re.compile(
+    r'((?:contribution|taxe|tva|fte|redevance).*?)(?:montant\s*total|bulletin|$)',
+    re.IGNORECASE | re.DOTALL
+)
+_RE_SONEDE_MONTANTS_ZONE = re.compile(r'((?:montant|total|net).*)', re.IGNORECASE | re.DOTALL)
+
+# ── STEG ──
+_STEG_QUANTITE_PATTERNS = tuple(re.compile(p) for p in [
+    r'quantit[ée]\s*(?:\(\d\))?\s+(\d+)',
+    r'[ée]quantit[ée]?\s+(\d+)',
+])
+_RE_KWH_VAL = re.compile(r'(\d+)\s*kwh')
+_RE_INDEX_PAIR = re.compile(r'(\d{4,7})\s+(\d{4,7})')
+_RE_REF_FACTURE = re.compile(r'[Rr][ée]f[ée]rence\s*:\s*([\d\s]+\d)')
+_RE_WHITESPACE = re.compile(r'\s+')
+_RE_GAZ_INDICATOR = re.compile(
+    r'gaz[\s-]*natur|sg\d{6,}|\bgaz\b[^a-z]*\d{2,5}\s+\d{3,7}\s+\d{3,7}|'
+    r'gaz\b[^a-z]*redevance|غاز\s*طبيعي'
+)
+_RE_STEG_GAZ_SECTION = re.compile(
+    r'(?:total\s*electricit[ée]|مجموع\s*الكهرباء)'
+    r'(.*?)'
+    r'(?:total\s*gaz|مجموع\s*الغاز)',
+    re.IGNORECASE | re.DOTALL
+)
+_STEG_MONTANT_PAYER_PATTERNS = (
+    # "Montant à payer  595.000"
+    re.compile(r'montant\s*(?:à|a)\s*payer[:\s]*([\d]+[.,]\d{3})'),
+    # "595.000  Montant à payer" (direct)
+    re.compile(r'([\d]+[.,]\d{3})\s*(?:,?\s*montant\s*(?:à|a)\s*payer)'),
+    # STEG : "595.000  QUINZE DINARS ... Montant à payer" (amount in words between)
+    # — classe de lettres majuscules : garde re.IGNORECASE
+    re.compile(
+        r'([\d]+[.,]\d{3})\s+[A-ZÀ-Ÿ\s.,\-]+(?:dinars?|millimes?)[A-ZÀ-Ÿ\s.,\-]*montant\s*(?:à|a)\s*payer',
+        re.IGNORECASE
+    ),
+    # Plus souple
+    re.compile(r'montant\s*(?:à|a)\s*payer[:\s]*([\d.,]+)'),
+    re.compile(r'([\d]+[.,]\d{3})\s+montant\s*(?:à|a)\s*payer'),
+)
+_STEG_BULLETIN_PATTERNS = tuple(re.compile(p, re.IGNORECASE | re.DOTALL) for p in [
+    r'bulletin\s*de\s*versement.*?(\d+[.,]\d{3})\s*montant',
+    r'bulletin\s*de\s*versement.*?montant[:\s]*([\d.,]+)',
+    r'(\d+[.,]\d{3})\s+montant\b',
+])
+_STEG_MONTANT_TOTAL_PATTERNS = tuple(re.compile(p) for p in [
+    r'montant\s*total[:\s]*([\d]+[.,]\d+)',
+    r'([\d]+[.,]\d+)\s*montant\s*total',
+])
+_STEG_SOUS_TOTAL_PATTERNS = tuple(
+    (re.compile(label_re + r'[:\s]*([\d.,]+)'), champ)
+    for label_re, champ in [
+        (r'total\s*electricit[ée]', _CHAMP_SOUS_TOTAL_ELEC),
+        (r'total\s*gaz', _CHAMP_SOUS_TOTAL_GAZ),
+        (r'total\s*services', _CHAMP_SOUS_TOTAL_SERVICES),
+    ]
+)
+_RE_DATE_ISO = re.compile(r'(\d{4}-\d{2}-\d{2})')
+_RE_DISTRICT = re.compile(r'(?:d[ée]pannage|district)\s*[:\s]*(\d+)')
+_RE_POSTE = re.compile(r'poste\s*(\d+)')
+
+# ── SONEDE ──
+_RE_SONEDE_M3 = re.compile(r'(\d[\d\s.,]*)\s*(m[³3]|m\s*cube)', re.IGNORECASE)
+_RE_SONEDE_CONSO = re.compile(r'consommation[:\s]*(\d+)')
+_RE_SONEDE_INDEX = re.compile(r'(\d{3,8})\s+(\d{3,8})\s+(?:ancien|consommation)')
+
+# ── Période / références / adresse ──
+_PERIOD_PATTERNS = tuple(_compile_linear(p, re.IGNORECASE) for p in [
+    r'(?:du|from|période|periode)\s*[:\s]?\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:au|to|[-–])\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
+    r'(?:من)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:إلى|الى)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
+    r'(\d{4}-\d{2}-\d{2})\s*[:\s]*(?:إل[يى]|à|au|to)?\s*[:\s]*(\d{4}-\d{2}-\d{2})',
+    r'((?:janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre|january|february|march|april|may|june|july|august|september|october|november|december|جانفي|فيفري|مارس|أفريل|ماي|جوان|جويلية|أوت|سبتمبر|أكتوبر|نوفمبر|ديسمبر)\s+\d{4})',
+    r'(\d{1,2}[/\-]\d{4})\s*[-–à]\s*(\d{1,2}[/\-]\d{4})',
+    r'((?:T[1-4]|Q[1-4]|trimestre\s*\d)\s*\d{4})',
+])
+_REF_FACTURE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'(?:r[ée]f[ée]rence|n[°o\.]\s*facture|invoice\s*(?:no?|#)|رقم\s*الفاتورة)\s*[:\s]*([\w\d/\-]+)',
+    r'(?:facture\s*n[°o])\s*[:\s]*([\w\d/\-]+)',
+])
+_REF_CLIENT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'(?:r[ée]f[ée]rence\s*client|n[°o\.]\s*client|n[°o\.]\s*abonn[ée]|n[°o\.]\s*compteur|customer\s*(?:no?|#|ref)|رقم\s*العميل|رقم\s*المشترك)\s*[:\s]*([\w\d/\-]+)',
+])
+# (pattern, groupe à extraire)
+_ADDRESS_PATTERNS = tuple((re.compile(p, re.IGNORECASE), 0 if '(' not in p[:5] else 1) for p in [
+    r'(?:adresse|address|عنوان)\s*[:\s]*(.{10,80}?)(?:\n|$)',
+    r'((?:نهج|شارع|حي|طريق)\s+.{5,60})',
+    r'((?:rue|avenue|boulevard|bd|impasse)\s+.{5,60})',
+])
+
+# ── Consommations génériques ──
+# Une alternance par famille d'unités : un seul balayage de `texte_lower` par
+# famille. Chaque variante est nommée g<i> et sa valeur est son 1er groupe.
+# Les familles restent séparées : un match d'une famille ne doit pas masquer
+# un nombre qui se chevauche dans une autre.
+_KWH_PATTERNS = [
+    r'([\d\s.,]+)\s*(kwh)',
+    r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(kwh)',
+    r'[ée]nergie[:\s]*(?:consomm[ée]e)?[:\s]*([\d\s.,]+)\s*(kwh)',
+    r'total[:\s]*([\d\s.,]+)\s*(kwh)',
+    r'استهلاك[:\s]*([\d\s.,]+)\s*(kwh|ك\.?و\.?س|كيلوواط)',
+    r'طاقة[:\s]*([\d\s.,]+)\s*(kwh|ك\.?و\.?س)',
+    r'([\d\s.,]+)\s*(ك\.?و\.?س|كيلوواط)',
+]
+_M3_PATTERNS = [
+    r'([\d\s.,]+)\s*(m[³3]|m\s*cube)',
+    r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(m[³3])',
+    r'volume[:\s]*([\d\s.,]+)\s*(m[³3])',
+    r'([\d\s.,]+)\s*(متر\s*مكعب|م[³3])',
+    r'استهلاك[:\s]*([\d\s.,]+)\s*(م[³3]|m[³3])',
+]
+_LITRE_PATTERNS = [
+    r'([\d\s.,]+)\s*(litres?|l\b)',
+    r'quantit[ée][:\s]*([\d\s.,]+)\s*(litres?|l\b)',
+    r'volume[:\s]*([\d\s.,]+)\s*(litres?|l\b)',
+    r'([\d\s.,]+)\s*(لتر)',
+    r'كمية[:\s]*([\d\s.,]+)\s*(لتر|litres?)',
+]
+
+
+def _iter_fused_values(rx: re.Pattern, dispatch: Dict[int, Tuple[int, int, int]], text: str) -> Iterator[str]:
+    """1er groupe de la variante qui a matché, pour chaque match de l'alternance."""
+    for m in rx.finditer(text):
+        yield m.group(dispatch[m.lastindex][1])
+
+
+_RE_KWH_ALL, _KWH_DISPATCH = _fuse_patterns(_KWH_PATTERNS)
+# Sans unité : balayé à part pour ne pas capturer "quantité (1) 1" dans "… 1 609 kwh"
+_RE_KWH_QUANTITE = re.compile(r'quantit[ée]\s*(?:\(\d\))?\s+(\d+)')
+_RE_M3_ALL, _M3_DISPATCH = _fuse_patterns(_M3_PATTERNS)
+_RE_LITRE_ALL, _LITRE_DISPATCH = _fuse_patterns(_LITRE_PATTERNS)
+
+# ── Montants génériques ── (pattern, champ, confiance)
+_AMOUNT_SPECS = [(_portable_atomic(p), champ, conf) for p, champ, conf in [
+    (r'montant\s*(?:à|a)\s*payer[:\s]*([\d\s.,]+)', _CHAMP_MONTANT_PAYER, 0.90),
+    (r'([\d]+[.,]\d{3})\s+montant\s*(?:à|a)\s*payer', _CHAMP_MONTANT_PAYER, 0.90),
+    (r'net\s*(?:à|a)\s*payer[:\s]*((?>[\d\s.,]+))\s*(dt|tnd|€|eur|dinars?|euros?)', "Net à payer", 0.85),
+    (r'total\s*ttc[:\s]*((?>[\d\s.,]+))\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Total TTC", 0.85),
+    (r'montant\s*total[:\s]*([\d\s.,]*\d)', "Montant total", 0.80),
+    (r'montant[:\s]*((?>[\d\s.,]+))\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Montant facture", 0.75),
+    (r'total[:\s]*((?>[\d\s.,]+))\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Total", 0.70),
+    (r'المبلغ[:\s]*((?>[\d\s.,]+))\s*(د\.?ت|dt|tnd|دينار)', "Montant (المبلغ)", 0.80),
+    (r'المجموع[:\s]*((?>[\d\s.,]+))\s*(د\.?ت|dt|tnd|دينار)', "Total (المجموع)", 0.75),
+    (r'الصافي[:\s]*((?>[\d\s.,]+))\s*(د\.?ت|dt|tnd|دينار)', "Net (الصافي)", 0.85),
+]]
+
+
+# Patterns en minuscules, appliqués sans IGNORECASE à `texte_lower_lignes` ; la
+# variante _CI (sur le texte brut) ne sert que si la mise en minuscules
+# n'est pas fidèle (voir `_lower_is_faithful`).
+_RE_AMOUNT_ALL, _AMOUNT_DISPATCH = _fuse_patterns([p for p, _, _ in _AMOUNT_SPECS], as_bytes=True)
+_RE_AMOUNT_ALL_CI, _ = _fuse_patterns([p for p, _, _ in _AMOUNT_SPECS], re.IGNORECASE, as_bytes=True)
+
+# ── CO₂ déclaré ──
+_CO2_PATTERNS = [_portable_atomic(p) for p in [
+    r'(?:co2|co₂|carbone|émissions?|emissions?)[:\s]*((?>[\d\s.,]+))\s*(kg|tonnes?|t\b|g\b)',
+    r'((?>[\d\s.,]+))\s*(kg|tonnes?|t)\s*(?:de\s+)?(?:co2|co₂|carbone)',
+    r'empreinte\s*carbone[:\s]*((?>[\d\s.,]+))\s*(kg|tonnes?|t)',
+]]
+_RE_CO2_ALL, _CO2_DISPATCH = _fuse_patterns(_CO2_PATTERNS, as_bytes=True)
+_RE_CO2_ALL_CI, _ = _fuse_patterns(_CO2_PATTERNS, re.IGNORECASE, as_bytes=True)
+
+# ── Validation croisée ──
+_RE_DATE_ISO_PARTS = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  STRUCTURES DE DONNÉES
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
-class DonneeEnvironnementale:
+_CHAMPS_MONTANT_TOTAL = frozenset(("montant total", "montant total ht", "total ttc"))
+_DEVISES = frozenset(("DT", "EUR", "USD"))
+
+
+def _classify_donnee(champ_lower: str, unite: Optional[str]) -> Optional[str]:
+    """Classe exclusive d'une donnée pour la validation croisée.
+
+    "conso_kwh", "montant_payer", "montant_total" ou None — dans cet ordre
+    de priorité, comme les tests successifs de `_cross_validate`.
+    """
+    if unite == _UNITE_KWH:
+        return "conso_kwh"
+    if "payer" in champ_lower:
+        return "montant_payer"
+    if champ_lower in _CHAMPS_MONTANT_TOTAL and unite in _DEVISES:
+        return "montant_total"
+    return None
+
+
+class _DonneeDerivee:
+    """Valeurs dérivées d'une donnée, calculées une fois à la construction.
+
+    Slots hors des champs de la dataclass : absents de `asdict()`, du repr et des comparaisons.
+    `_val_float` : valeur numérique, None si `valeur` n'est pas un nombre ;
+    `_champ_lower` / `_kind` : libellé en minuscules et classe (voir `_classify_donnee`).
+    """
+    __slots__ = ("_val_float", "_champ_lower", "_kind")
+
+
+@dataclass(slots=True, frozen=True)
+class DonneeEnvironnementale(_DonneeDerivee):
     """Structure d'une donnée extraite pertinente pour le bilan carbone."""
     champ: str
     valeur: Optional[str] = None
     unite: Optional[str] = None
     confiance: float = 0.0
 
+    def __post_init__(self):
+        try:
+            val = float(self.valeur) if self.valeur else 0.0
+        except (ValueError, TypeError):
+            val = None
+        champ_l = self.champ.lower()
+        object.__setattr__(self, "_val_float", val)
+        object.__setattr__(self, "_champ_lower", champ_l)
+        object.__setattr__(self, "_kind", _classify_donnee(champ_l, self.unite))
+
+    def __reduce__(self):
+        # Reconstruit par le constructeur : les valeurs dérivées sont recalculées (pickle, copy)
+        return (type(self), (self.champ, self.valeur, self.unite, self.confiance))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"champ": self.champ, "valeur": self.valeur, "unite": self.unite, "confiance": self.confiance}
+
+
+@dataclass(slots=True, frozen=True)
+class CO2Detail:
+    """Émissions calculées pour un type d'énergie (une ligne du bilan CO₂)."""
+    type: str
+    consommation: float
+    unite: str
+    facteur: float
+    co2_kg: float
+    source: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type, "consommation": self.consommation, "unite": self.unite,
+            "facteur": self.facteur, "co2_kg": self.co2_kg, "source": self.source,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class ResultatExtraction:
     """Résultat complet de l'extraction environnementale."""
     type_facture: str = "inconnu"
@@ -128,29 +488,65 @@ class ResultatExtraction:
     reference_client: Optional[str] = None
     adresse: Optional[str] = None
     types_energie: List[str] = field(default_factory=list)
+    # Lignes du bilan CO₂ en dictionnaires (API publique) ; calculées en `CO2Detail`
     detail_co2: List[Dict[str, Any]] = field(default_factory=list)
     score_global: float = 0.0
     alertes: List[str] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        if d.get("emission_co2_kg") is not None:
-            d["emission_co2_kg"] = round(d["emission_co2_kg"], 3)
-        return d
+        return self._to_mapping(
+            [d.to_dict() for d in self.donnees],
+            [dict(info) for info in self.detail_co2],
+        )
 
     def to_json(self, indent: int = 2) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+        # Les données sont sérialisées à la volée par `default`
+        payload = self._to_mapping(self.donnees, self.detail_co2)
+        # orjson n'indente qu'à 2 espaces : les autres indentations restent sur json
+        if orjson is not None and indent == 2:
+            return orjson.dumps(
+                payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=_json_default,
+            ).decode("utf-8")
+        return json.dumps(payload, ensure_ascii=False, indent=indent, default=_json_default)
+
+    def _to_mapping(self, donnees: list, detail_co2: list) -> Dict[str, Any]:
+        """Copie superficielle champ par champ (même ordre que les champs déclarés)."""
+        return {
+            "type_facture": self.type_facture,
+            "fournisseur": self.fournisseur,
+            "periode": self.periode,
+            "donnees": donnees,
+            "emission_co2_kg": None if self.emission_co2_kg is None else round(self.emission_co2_kg, 3),
+            "facteur_emission_utilise": self.facteur_emission_utilise,
+            "source_facteur": self.source_facteur,
+            "resume": self.resume,
+            "reference_facture": self.reference_facture,
+            "reference_client": self.reference_client,
+            "adresse": self.adresse,
+            "types_energie": list(self.types_energie),
+            "detail_co2": detail_co2,
+            "score_global": self.score_global,
+            "alertes": list(self.alertes),
+        }
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, DonneeEnvironnementale):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  ANALYSE DE ZONES (TEXT STRUCTURE)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class TextZones:
     """Découpe du texte OCR en zones sémantiques."""
     texte_complet: str
     texte_lower: str
+    # Minuscules, sauts de ligne conservés : un nombre ne déborde pas sur la ligne suivante
+    texte_lower_lignes: str
     entete: str = ""
     consommation: str = ""
     electricite: str = ""
@@ -160,80 +556,159 @@ class TextZones:
     pied: str = ""
 
 
-def _normalize(text: str) -> str:
-    return text.lower().replace("\n", " ").replace("\r", " ")
+def _normalize(text_lower_lines: str) -> str:
+    """Texte déjà en minuscules, mis sur une seule ligne (pas de second `lower()`)."""
+    return text_lower_lines.replace("\n", " ").replace("\r", " ")
 
 
-def _parse_zones_steg(text: str, text_lower: str) -> TextZones:
-    """Découpe spécifique STEG — sépare électricité / gaz / montants."""
-    zones = TextZones(texte_complet=text, texte_lower=text_lower)
+# Nombre OCR → littéral float : espaces de milliers retirés, virgule → point,
+# en un seul passage (au lieu de deux .replace()).
+_NUM_TRANS = str.maketrans({" ": None, ",": "."})
 
-    m_conso = re.search(r'consommation', text, re.IGNORECASE)
-    if m_conso:
-        zones.entete = text[:m_conso.start()]
-        rest = text[m_conso.start():]
-    else:
-        zones.entete = text[:300]
-        rest = text
 
-    zones.consommation = rest
+def _parse_amount(raw: str) -> Optional[float]:
+    """`float()` d'un nombre OCR normalisé, ou None s'il n'est pas numérique."""
+    try:
+        return float(raw.translate(_NUM_TRANS))
+    except ValueError:
+        return None
 
-    # Section Electricité
-    elec_match = re.search(
-        r'(electricit[ée].*?)(?=total\s*gaz|redevances?\s*fixes.*?gaz|\bgaz\b\s+redevance)',
-        rest, re.IGNORECASE | re.DOTALL
-    )
-    if elec_match:
-        zones.electricite = elec_match.group(1)
 
-    # Section Gaz (entre "Total Electricité" et "Total Gaz")
-    gaz_match = re.search(
-        r'(?:total\s*electricit[ée]|مجموع\s*الكهرباء)(.*?)(?:total\s*gaz|مجموع\s*الغاز|total\s*services)',
-        rest, re.IGNORECASE | re.DOTALL
-    )
-    if gaz_match:
-        zones.gaz = gaz_match.group(1)
+def _find_lower(text: str, text_lower: str, word: str) -> int:
+    """Position de `word` (en minuscules) dans `text`, ou -1.
 
-    # Section Montants
-    montant_match = re.search(
-        r'(montant\s*total.*?)(?:bulletin|versement|fermer|$)',
-        rest, re.IGNORECASE | re.DOTALL
-    )
-    if montant_match:
-        zones.montants = montant_match.group(1)
+    `text_lower` partage les indices de `text` dès que la mise en minuscules
+    n'a pas changé la longueur (aucun caractère n'a été développé).
+    """
+    if len(text_lower) == len(text):
+        return text_lower.find(word)
+    m = re.search(re.escape(word), text, re.IGNORECASE)
+    return m.start() if m else -1
 
-    # Pied de page
-    pied_match = re.search(r'(bulletin\s*de\s*versement.*)', rest, re.IGNORECASE | re.DOTALL)
-    if pied_match:
-        zones.pied = pied_match.group(1)
 
-    # Taxes
-    taxes_match = re.search(
-        r'((?:contribution|taxe|tva|fte|redevance).*?)(?:montant\s*total|bulletin|$)',
-        rest, re.IGNORECASE | re.DOTALL
-    )
-    if taxes_match:
-        zones.taxes = taxes_match.group(1)
+def _iter_gas_digit_runs(zone_text: str) -> Iterator[int]:
+    """Nombres de 2 à 5 chiffres ni précédés d'un point, ni suivis de « .chiffre ».
+
+    Équivalent de `(?<![.\\d])(\\d{2,5})(?!\\.\\d)` en un seul parcours : une
+    séquence trop longue donne ses 5 premiers chiffres, une séquence suivie
+    d'une décimale perd son dernier chiffre (comme le retour arrière regex).
+    """
+    n = len(zone_text)
+    i = 0
+    while i < n:
+        if not zone_text[i].isdecimal():
+            i += 1
+            continue
+        start = i
+        while i < n and zone_text[i].isdecimal():
+            i += 1
+        if start and zone_text[start - 1] == ".":
+            continue
+        run = i - start
+        if run > 5:
+            run = 5
+        elif i + 1 < n and zone_text[i] == "." and zone_text[i + 1].isdecimal():
+            run -= 1
+        if run >= 2:
+            yield int(zone_text[start:start + run])
+
+
+# Littéral par lequel commence obligatoirement chaque zone STEG : la regex de
+# la zone est lancée à la 1re occurrence, ou sautée si le littéral est absent.
+_STEG_ZONE_ANCHORS: Dict[str, Tuple[str, ...]] = {
+    "electricite": ("electricit",),
+    "gaz": ("total", "مجموع"),
+    "montants": ("montant",),
+    "pied": ("bulletin",),
+    "taxes": ("contribution", "taxe", "tva", "fte", "redevance"),
+}
+_STEG_ZONE_PATTERNS = (
+    ("electricite", _RE_STEG_ELEC_ZONE),
+    ("gaz", _RE_STEG_GAZ_ZONE),
+    ("montants", _RE_STEG_MONTANTS_ZONE),
+    ("pied", _RE_STEG_PIED_ZONE),
+    ("taxes", _RE_STEG_TAXES_ZONE),
+)
+_STEG_ZONE_AC = _build_automaton(
+    (word, word)
+    for word in {"consommation", *(a for anchors in _STEG_ZONE_ANCHORS.values() for a in anchors)}
+)
+
+
+def _anchor_positions(text_lower: str) -> Dict[str, List[int]]:
+    """Positions (croissantes) de chaque littéral STEG — un seul passage Aho–Corasick."""
+    positions: Dict[str, List[int]] = {}
+    if _STEG_ZONE_AC is None:
+        for anchors in (("consommation",), *_STEG_ZONE_ANCHORS.values()):
+            for word in anchors:
+                pos = text_lower.find(word)
+                while pos >= 0:
+                    positions.setdefault(word, []).append(pos)
+                    pos = text_lower.find(word, pos + 1)
+        return positions
+    for end, word in _STEG_ZONE_AC.iter(text_lower):
+        positions.setdefault(word, []).append(end - len(word) + 1)
+    for starts in positions.values():
+        starts.sort()
+    return positions
+
+
+def _parse_zones_steg(text: str, text_lower: str, text_lower_lines: str) -> TextZones:
+    """Découpe spécifique STEG — sépare électricité / gaz / montants."""
+    zones = TextZones(texte_complet=text, texte_lower=text_lower, texte_lower_lignes=text_lower_lines)
+
+    positions = None
+    if _lower_is_faithful(text, text_lower):
+        positions = _anchor_positions(text_lower)
+        pos_conso = positions["consommation"][0] if "consommation" in positions else -1
+    else:
+        pos_conso = _find_lower(text, text_lower, "consommation")
+
+    if pos_conso >= 0:
+        zones.entete = text[:pos_conso]
+        rest = text[pos_conso:]
+    else:
+        zones.entete = text[:300]
+        rest = text
+
+    zones.consommation = rest
+    base = max(pos_conso, 0)
+
+    # Electricité, Gaz (entre "Total Electricité" et "Total Gaz"), Montants,
+    # Pied de page, Taxes — `rest` étant un suffixe de `text`, la recherche
+    # depuis l'ancre dans `text` donne le même groupe.
+    for name, rx in _STEG_ZONE_PATTERNS:
+        if positions is None:
+            match = rx.search(rest)
+        else:
+            starts = [
+                next((p for p in positions.get(a, ()) if p >= base), -1)
+                for a in _STEG_ZONE_ANCHORS[name]
+            ]
+            starts = [p for p in starts if p >= 0]
+            match = rx.search(text, min(starts)) if starts else None
+        if match:
+            setattr(zones, name, match.group(1))
 
     return zones
 
 
-def _parse_zones_sonede(text: str, text_lower: str) -> TextZones:
-    zones = TextZones(texte_complet=text, texte_lower=text_lower)
-    m_conso = re.search(r'consommation', text, re.IGNORECASE)
-    if m_conso:
-        zones.entete = text[:m_conso.start()]
+def _parse_zones_sonede(text: str, text_lower: str, text_lower_lines: str) -> TextZones:
+    zones = TextZones(texte_complet=text, texte_lower=text_lower, texte_lower_lignes=text_lower_lines)
+    pos_conso = _find_lower(text, text_lower, "consommation")
+    if pos_conso >= 0:
+        zones.entete = text[:pos_conso]
     else:
         zones.entete = text[:300]
     zones.consommation = text
-    montant_match = re.search(r'((?:montant|total|net).*)', text, re.IGNORECASE | re.DOTALL)
+    montant_match = _RE_SONEDE_MONTANTS_ZONE.search(text)
     if montant_match:
         zones.montants = montant_match.group(1)
     return zones
 
 
-def _parse_zones_generic(text: str, text_lower: str) -> TextZones:
-    zones = TextZones(texte_complet=text, texte_lower=text_lower)
+def _parse_zones_generic(text: str, text_lower: str, text_lower_lines: str) -> TextZones:
+    zones = TextZones(texte_complet=text, texte_lower=text_lower, texte_lower_lignes=text_lower_lines)
     zones.entete = text[:min(500, len(text))]
     zones.consommation = text
     zones.montants = text
@@ -251,6 +726,7 @@ class ExtractionStrategy(ABC):
         self.zones = zones
         self.text = zones.texte_complet
         self.text_lower = zones.texte_lower
+        self.text_lower_lines = zones.texte_lower_lignes
 
     @abstractmethod
     def extract_consumption(self) -> List[DonneeEnvironnementale]: ...
@@ -259,7 +735,7 @@ class ExtractionStrategy(ABC):
     def extract_amounts(self) -> List[DonneeEnvironnementale]: ...
 
     def extract_period(self) -> Optional[str]:
-        return _extract_period_generic(self.text)
+        return _extract_period_cached(self.text)
 
     def extract_reference(self) -> Tuple[Optional[str], Optional[str]]:
         return _extract_references_generic(self.text, self.text_lower)
@@ -294,56 +770,60 @@ class STEGStrategy(ExtractionStrategy):
         elec_kwh = self._extract_steg_electricity()
         if elec_kwh is not None:
             donnees.append(DonneeEnvironnementale(
-                champ="Énergie consommée (électricité)",
-                valeur=str(elec_kwh), unite="kWh", confiance=0.90
+                champ=_CHAMP_ENERGIE_ELEC,
+                valeur=str(elec_kwh), unite=_UNITE_KWH, confiance=0.90
             ))
 
         # ── 2. Gaz (m³) — extraction contextuelle ──
         gaz_m3 = self._extract_steg_gas()
         if gaz_m3 is not None:
             donnees.append(DonneeEnvironnementale(
-                champ="Volume consommé (gaz)",
-                valeur=str(gaz_m3), unite="m³", confiance=0.85
+                champ=_CHAMP_VOLUME_GAZ,
+                valeur=str(gaz_m3), unite=_UNITE_M3, confiance=0.85
             ))
 
         return donnees
 
     def _extract_steg_electricity(self) -> Optional[int]:
-        """Cross-validation multi-source pour la quantité d'électricité."""
-        candidates: List[Tuple[str, int, float]] = []
+        """Cross-validation multi-source pour la quantité d'électricité.
+
+        Si le libellé « Quantité » donne déjà deux fois la même valeur, les
+        sources suivantes (balayage kWh, différence d'index) sont ignorées.
+        """
+        counts: Counter = Counter()
 
         # Source 1 : "Quantité (1) 483" ou "éQuantité  483"
-        for pat in [
-            r'quantit[ée]\s*(?:\(\d\))?\s+(\d+)',
-            r'[ée]quantit[ée]?\s+(\d+)',
-        ]:
-            for m in re.finditer(pat, self.text, re.IGNORECASE):
-                val = int(m.group(1))
-                if 1 <= val <= 100_000:
-                    candidates.append(("quantite_label", val, 0.90))
+        counts.update(
+            val
+            for rx in _STEG_QUANTITE_PATTERNS
+            for m in rx.finditer(self.text_lower)
+            if 1 <= (val := int(m.group(1))) <= 100_000
+        )
+        if counts:
+            best_val, best_count = counts.most_common(1)[0]
+            if best_count >= 2:
+                return best_val
 
         # Source 2 : "<N> kWh" explicite
-        for m in re.finditer(r'(\d+)\s*kwh', self.text, re.IGNORECASE):
-            val = int(m.group(1))
-            if 1 <= val <= 100_000:
-                candidates.append(("kwh_unit", val, 0.85))
+        counts.update(
+            val
+            for m in _RE_KWH_VAL.finditer(self.text_lower)
+            if 1 <= (val := int(m.group(1))) <= 100_000
+        )
 
         # Source 3 : Différence d'index
-        idx_match = re.search(r'(\d{4,7})\s+(\d{4,7})', self.zones.electricite or self.text)
+        idx_match = _RE_INDEX_PAIR.search(self.zones.electricite or self.text)
         if idx_match:
             a, b = int(idx_match.group(1)), int(idx_match.group(2))
             diff = abs(a - b)
             if 1 <= diff <= 100_000:
-                candidates.append(("index_diff", diff, 0.80))
+                counts[diff] += 1
 
-        if not candidates:
+        if not counts:
             return None
 
         # Cross-validation : majorité vote
-        values = [c[1] for c in candidates]
-        counts = Counter(values)
-        best_val, best_count = counts.most_common(1)[0]
-        return best_val
+        return counts.most_common(1)[0][0]
 
     def _extract_steg_gas(self) -> Optional[int]:
         """Extraction contextuelle gaz entre sections STEG.
@@ -355,17 +835,12 @@ class STEGStrategy(ExtractionStrategy):
         """
         # Récupérer la ref pour éviter les faux positifs
         ref_numbers = set()
-        ref_match = re.search(r'[Rr][ée]f[ée]rence\s*:\s*([\d\s]+\d)', self.text)
+        ref_match = _RE_REF_FACTURE.search(self.text)
         if ref_match:
-            for part in re.findall(r'\d+', ref_match.group(1)):
-                ref_numbers.add(int(part))
+            ref_numbers = {int(p) for p in ref_match.group(1).split() if p.isdecimal()}
 
         # Vérifier qu'il y a un VRAI indicateur de consommation gaz
-        has_gaz_conso = bool(re.search(
-            r'gaz[\s-]*natur|sg\d{6,}|\bgaz\b[^a-z]*\d{2,5}\s+\d{3,7}\s+\d{3,7}|'
-            r'gaz\b[^a-z]*redevance|غاز\s*طبيعي',
-            self.text, re.IGNORECASE
-        ))
+        has_gaz_conso = bool(_RE_GAZ_INDICATOR.search(self.text_lower))
         if not has_gaz_conso:
             return None
 
@@ -376,12 +851,7 @@ class STEGStrategy(ExtractionStrategy):
                 return result
 
         # Stratégie 2 : recherche contextuelle globale
-        gaz_section = re.search(
-            r'(?:total\s*electricit[ée]|مجموع\s*الكهرباء)'
-            r'(.*?)'
-            r'(?:total\s*gaz|مجموع\s*الغاز)',
-            self.text, re.IGNORECASE | re.DOTALL
-        )
+        gaz_section = _RE_STEG_GAZ_SECTION.search(self.text)
         if gaz_section:
             result = self._find_gas_quantity_in_zone(gaz_section.group(1), ref_numbers)
             if result is not None:
@@ -391,13 +861,10 @@ class STEGStrategy(ExtractionStrategy):
 
     def _find_gas_quantity_in_zone(self, zone_text: str, exclude: set = None) -> Optional[int]:
         """Cherche une quantité gaz dans une zone, avec exclusion de faux positifs."""
-        if exclude is None:
-            exclude = set()
-        candidates = re.findall(r'(?<![.\d])(\d{2,5})(?!\.\d)', zone_text)
-        for c in candidates:
-            cv = int(c)
-            # Plage résidentielle gaz : 10–2000 m³ (excl. années, refs)
-            if 50 <= cv <= 2000 and not (2000 <= cv <= 2100) and cv not in exclude:
+        exclude = exclude or ()
+        for cv in _iter_gas_digit_runs(zone_text):
+            # Plage résidentielle gaz : 50–1999 m³ (2000+ = années, refs)
+            if 50 <= cv < 2000 and cv not in exclude:
                 return cv
         return None
 
@@ -415,7 +882,7 @@ class STEGStrategy(ExtractionStrategy):
             key = f"{val:.3f}"
             seen.add(key)
             donnees.append(DonneeEnvironnementale(
-                champ="Montant à payer", valeur=key, unite="DT", confiance=0.95
+                champ=_CHAMP_MONTANT_PAYER, valeur=key, unite=_UNITE_DT, confiance=0.95
             ))
 
         # ── 2. Bulletin de versement ──
@@ -425,7 +892,7 @@ class STEGStrategy(ExtractionStrategy):
             if key not in seen:
                 seen.add(key)
                 donnees.append(DonneeEnvironnementale(
-                    champ="Montant bulletin", valeur=key, unite="DT", confiance=0.90
+                    champ=_CHAMP_MONTANT_BULLETIN, valeur=key, unite=_UNITE_DT, confiance=0.90
                 ))
 
         # ── 3. MONTANT TOTAL ──
@@ -435,112 +902,85 @@ class STEGStrategy(ExtractionStrategy):
             if key not in seen:
                 seen.add(key)
                 donnees.append(DonneeEnvironnementale(
-                    champ="Montant total HT", valeur=key, unite="DT", confiance=0.80
+                    champ=_CHAMP_MONTANT_TOTAL_HT, valeur=key, unite=_UNITE_DT, confiance=0.80
                 ))
 
         # ── 4. Sous-totaux ──
-        for label_re, champ in [
-            (r'total\s*electricit[ée]', "Sous-total électricité"),
-            (r'total\s*gaz', "Sous-total gaz"),
-            (r'total\s*services', "Sous-total services"),
-        ]:
-            m = re.search(label_re + r'[:\s]*([\d.,]+)', self.text, re.IGNORECASE)
+        for rx, champ in _STEG_SOUS_TOTAL_PATTERNS:
+            m = rx.search(self.text_lower)
             if m:
-                try:
-                    fv = float(m.group(1).replace(",", "."))
-                    key = f"{fv:.3f}"
-                    if key not in seen and fv > 0.5:
-                        seen.add(key)
-                        donnees.append(DonneeEnvironnementale(
-                            champ=champ, valeur=key, unite="DT", confiance=0.70
-                        ))
-                except ValueError:
-                    pass
+                fv = _parse_amount(m.group(1))
+                if fv is None:
+                    continue
+                key = f"{fv:.3f}"
+                if key not in seen and fv > 0.5:
+                    seen.add(key)
+                    donnees.append(DonneeEnvironnementale(
+                        champ=champ, valeur=key, unite=_UNITE_DT, confiance=0.70
+                    ))
 
         # ── Cross-validation ──
         if val and val2 and abs(val - val2) < 0.01:
-            for d in donnees:
-                if d.champ == "Montant à payer":
-                    d.confiance = min(1.0, d.confiance + 0.05)
+            donnees = [
+                replace(d, confiance=min(1.0, d.confiance + 0.05)) if d.champ == _CHAMP_MONTANT_PAYER else d
+                for d in donnees
+            ]
 
         return donnees
 
     def _extract_montant_a_payer(self) -> Optional[float]:
-        patterns = [
-            # "Montant à payer  595.000"
-            r'montant\s*(?:à|a)\s*payer[:\s]*([\d]+[.,]\d{3})',
-            # "595.000  Montant à payer" (direct)
-            r'([\d]+[.,]\d{3})\s*(?:,?\s*montant\s*(?:à|a)\s*payer)',
-            # STEG : "595.000  QUINZE DINARS ... Montant à payer" (amount in words between)
-            r'([\d]+[.,]\d{3})\s+[A-ZÀ-Ÿ\s.,\-]+(?:dinars?|millimes?)[A-ZÀ-Ÿ\s.,\-]*montant\s*(?:à|a)\s*payer',
-            # Plus souple
-            r'montant\s*(?:à|a)\s*payer[:\s]*([\d.,]+)',
-            r'([\d]+[.,]\d{3})\s+montant\s*(?:à|a)\s*payer',
-        ]
-        for pat in patterns:
-            m = re.search(pat, self.text, re.IGNORECASE)
+        for rx in _STEG_MONTANT_PAYER_PATTERNS:
+            m = rx.search(self.text_lower)
             if m:
-                try:
-                    return float(m.group(1).replace(",", "."))
-                except ValueError:
-                    continue
+                fv = _parse_amount(m.group(1))
+                if fv is not None:
+                    return fv
         return None
 
     def _extract_bulletin_versement(self) -> Optional[float]:
         pied = self.zones.pied or self.text
-        patterns = [
-            r'bulletin\s*de\s*versement.*?(\d+[.,]\d{3})\s*montant',
-            r'bulletin\s*de\s*versement.*?montant[:\s]*([\d.,]+)',
-            r'(\d+[.,]\d{3})\s+montant\b',
-        ]
-        for pat in patterns:
-            m = re.search(pat, pied, re.IGNORECASE | re.DOTALL)
+        for rx in _STEG_BULLETIN_PATTERNS:
+            m = rx.search(pied)
             if m:
-                try:
-                    return float(m.group(1).replace(",", "."))
-                except ValueError:
-                    continue
+                fv = _parse_amount(m.group(1))
+                if fv is not None:
+                    return fv
         return None
 
     def _extract_montant_total(self) -> Optional[float]:
-        patterns = [
-            r'montant\s*total[:\s]*([\d]+[.,]\d+)',
-            r'([\d]+[.,]\d+)\s*montant\s*total',
-        ]
-        for pat in patterns:
-            m = re.search(pat, self.text, re.IGNORECASE)
+        for rx in _STEG_MONTANT_TOTAL_PATTERNS:
+            m = rx.search(self.text_lower)
             if m:
-                try:
-                    return float(m.group(1).replace(",", "."))
-                except ValueError:
-                    continue
+                fv = _parse_amount(m.group(1))
+                if fv is not None:
+                    return fv
         return None
 
     def extract_period(self) -> Optional[str]:
         """STEG : dates ISO inversées (RTL)."""
-        dates = re.findall(r'(\d{4}-\d{2}-\d{2})', self.text)
+        dates = _RE_DATE_ISO.findall(self.text)
         if len(dates) >= 2:
             unique = sorted(set(dates))
             if len(unique) >= 2:
                 return f"{unique[0]} au {unique[1]}"
             s = sorted(dates[:2])
             return f"{s[0]} au {s[1]}"
-        return _extract_period_generic(self.text)
+        return _extract_period_cached(self.text)
 
     def extract_reference(self) -> Tuple[Optional[str], Optional[str]]:
         """STEG : 'Référence : 07283 740 0', District, Poste."""
         ref_facture = None
         ref_client = None
 
-        m = re.search(r'[Rr][ée]f[ée]rence\s*:\s*([\d\s]+\d)', self.text)
+        m = _RE_REF_FACTURE.search(self.text)
         if m:
-            ref_facture = re.sub(r'\s+', '', m.group(1).strip())
+            ref_facture = _RE_WHITESPACE.sub('', m.group(1).strip())
 
-        m = re.search(r'(?:d[ée]pannage|district)\s*[:\s]*(\d+)', self.text, re.IGNORECASE)
+        m = _RE_DISTRICT.search(self.text_lower)
         if m:
             ref_client = m.group(1).strip()
         elif not ref_client:
-            m = re.search(r'poste\s*(\d+)', self.text, re.IGNORECASE)
+            m = _RE_POSTE.search(self.text_lower)
             if m:
                 ref_client = f"Poste {m.group(1)}"
 
@@ -557,43 +997,40 @@ class SONEDEStrategy(ExtractionStrategy):
     def extract_consumption(self) -> List[DonneeEnvironnementale]:
         donnees: List[DonneeEnvironnementale] = []
 
-        for m in re.finditer(r'(\d[\d\s.,]*)\s*(m[³3]|m\s*cube)', self.text, re.IGNORECASE):
-            val = m.group(1).replace(" ", "").replace(",", ".")
+        for m in _RE_SONEDE_M3.finditer(self.text):
+            val = m.group(1).translate(_NUM_TRANS)
             try:
                 fv = float(val)
                 if 0.1 <= fv <= 100_000:
                     donnees.append(DonneeEnvironnementale(
-                        champ="Volume consommé (eau)", valeur=val, unite="m³", confiance=0.85
+                        champ=_CHAMP_VOLUME_EAU, valeur=val, unite=_UNITE_M3, confiance=0.85
                     ))
                     break
             except ValueError:
                 continue
 
         if not donnees:
-            m = re.search(r'consommation[:\s]*(\d+)', self.text, re.IGNORECASE)
+            m = _RE_SONEDE_CONSO.search(self.text_lower)
             if m:
                 val = m.group(1)
                 if 1 <= int(val) <= 100_000:
                     donnees.append(DonneeEnvironnementale(
-                        champ="Volume consommé (eau)", valeur=val, unite="m³", confiance=0.70
+                        champ=_CHAMP_VOLUME_EAU, valeur=val, unite=_UNITE_M3, confiance=0.70
                     ))
 
         if not donnees:
-            idx = re.search(
-                r'(\d{3,8})\s+(\d{3,8})\s+(?:ancien|consommation)',
-                self.text, re.IGNORECASE
-            )
+            idx = _RE_SONEDE_INDEX.search(self.text_lower)
             if idx:
                 diff = abs(int(idx.group(1)) - int(idx.group(2)))
                 if 1 <= diff <= 100_000:
                     donnees.append(DonneeEnvironnementale(
-                        champ="Volume consommé (eau)", valeur=str(diff), unite="m³", confiance=0.75
+                        champ=_CHAMP_VOLUME_EAU, valeur=str(diff), unite=_UNITE_M3, confiance=0.75
                     ))
 
         return donnees
 
     def extract_amounts(self) -> List[DonneeEnvironnementale]:
-        return _extract_amounts_generic(self.text)
+        return _extract_amounts_generic(self.text, self.text_lower_lines)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -604,26 +1041,64 @@ class GenericStrategy(ExtractionStrategy):
     """Extraction générique pour tout type de facture."""
 
     def extract_consumption(self) -> List[DonneeEnvironnementale]:
-        return _extract_consumption_generic(self.text, self.text_lower)
+        return _extract_consumption_generic(self.text, self.text_lower_lines)
 
     def extract_amounts(self) -> List[DonneeEnvironnementale]:
-        return _extract_amounts_generic(self.text)
+        return _extract_amounts_generic(self.text, self.text_lower_lines)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  FONCTIONS D'EXTRACTION GÉNÉRIQUE (shared)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _index_keywords() -> Dict[str, List[Tuple[str, str]]]:
+    """Mot-clé → catégories ("type" / "fournisseur", nom) qui le revendiquent.
+
+    Un même mot-clé peut appartenir à plusieurs catégories (ex. "steg", "eau").
+    """
+    owners: Dict[str, List[Tuple[str, str]]] = {}
+    for type_name, keywords in _TYPE_KEYWORDS.items():
+        for kw in keywords:
+            owners.setdefault(kw, []).append(("type", type_name))
+    for name, keywords, _ in _FOURNISSEUR_ROWS:
+        for kw in keywords:
+            owners.setdefault(kw, []).append(("fournisseur", name))
+    return owners
+
+
+_KEYWORD_OWNERS = _index_keywords()
+
+
+_KEYWORD_AC = _build_automaton((kw, kw) for kw in _KEYWORD_OWNERS)
+
+
+def _matched_keywords(text_lower: str) -> set:
+    """Mots-clés (types + fournisseurs) présents — un seul passage Aho–Corasick."""
+    if _KEYWORD_AC is None:
+        return {kw for kw in _KEYWORD_OWNERS if kw in text_lower}
+    return {kw for _, kw in _KEYWORD_AC.iter(text_lower)}
+
+
+def _keyword_counts(text_lower: str, kind: str) -> Counter:
+    """Nombre de mots-clés distincts trouvés par catégorie du genre `kind`."""
+    counts: Counter = Counter()
+    for kw in _matched_keywords(text_lower):
+        for owner_kind, name in _KEYWORD_OWNERS[kw]:
+            if owner_kind == kind:
+                counts[name] += 1
+    return counts
+
+
 def _detect_all_types(text_lower: str) -> List[str]:
     """Détecte TOUS les types d'énergie présents (pas seulement le principal)."""
-    scores: Dict[str, int] = {}
-    for type_name, keywords in _TYPE_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text_lower)
-        if score > 0:
-            scores[type_name] = score
+    counts = _keyword_counts(text_lower, "type")
+    # Ordre de _TYPE_KEYWORDS conservé pour départager les ex-aequo
+    scores: Dict[str, int] = {t: counts[t] for t in _TYPE_KEYWORDS if counts[t] > 0}
 
     if not scores:
         return ["inconnu"]
+    if len(scores) == 1:
+        return [next(iter(scores))]
 
     sorted_types = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     max_score = sorted_types[0][1]
@@ -633,57 +1108,13 @@ def _detect_all_types(text_lower: str) -> List[str]:
 
 def _detect_fournisseur(text_lower: str) -> Optional[str]:
     """Détecte le fournisseur avec scoring pondéré."""
-    fournisseurs = {
-        "STEG": {
-            "keywords": [
-                "steg",
-                "société tunisienne de l'électricité et du gaz",
-                "societe tunisienne de l electricite",
-                "société tunisienne du gaz",
-                "societe tunisienne du gaz",
-                "tunisienne du gaz",
-                "tunisienne de l'électricité",
-                "tunisienne de l electricite",
-                "الشركة التونسية للكهرباء",
-                "الشركة التونسية للكهرباء والغاز",
-                "للكهرباء والغاز",
-                "للهرباء",
-            ],
-            "weight": 1.0,
-        },
-        "SONEDE": {
-            "keywords": [
-                "eau",
-                "sonede",
-                "société nationale d'exploitation et de distribution des eaux",
-                "societe nationale d exploitation",
-                "distribution des eaux",
-                "الشركة الوطنية لاستغلال وتوزيع المياه",
-                "توزيع المياه",
-            ],
-            "weight": 1.0,
-        },
-        "EDF": {
-            "keywords": ["edf", "électricité de france", "electricite de france"],
-            "weight": 1.0,
-        },
-        "Engie": {
-            "keywords": ["engie"],
-            "weight": 1.0,
-        },
-        "TotalEnergies": {
-            "keywords": ["totalenergies", "total energies"],
-            "weight": 1.0,
-        },
-        "Shell": {
-            "keywords": ["shell energy", "shell"],
-            "weight": 0.8,
-        },
-    }
+    if len(text_lower) < _FOURNISSEUR_MIN_KW_LEN:
+        return None
+    counts = _keyword_counts(text_lower, "fournisseur")
     best_name = None
     best_score = 0.0
-    for name, config in fournisseurs.items():
-        score = sum(config["weight"] for kw in config["keywords"] if kw in text_lower)
+    for name, _, weight in _FOURNISSEUR_ROWS:
+        score = weight * counts[name]
         if score > best_score:
             best_score = score
             best_name = name
@@ -691,16 +1122,8 @@ def _detect_fournisseur(text_lower: str) -> Optional[str]:
 
 
 def _extract_period_generic(text: str) -> Optional[str]:
-    period_patterns = [
-        r'(?:du|from|période|periode)\s*[:\s]?\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:au|to|[-–])\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
-        r'(?:من)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:إلى|الى)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
-        r'(\d{4}-\d{2}-\d{2})\s*[:\s]*(?:إل[يى]|à|au|to)?\s*[:\s]*(\d{4}-\d{2}-\d{2})',
-        r'((?:janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre|january|february|march|april|may|june|july|august|september|october|november|december|جانفي|فيفري|مارس|أفريل|ماي|جوان|جويلية|أوت|سبتمبر|أكتوبر|نوفمبر|ديسمبر)\s+\d{4})',
-        r'(\d{1,2}[/\-]\d{4})\s*[-–à]\s*(\d{1,2}[/\-]\d{4})',
-        r'((?:T[1-4]|Q[1-4]|trimestre\s*\d)\s*\d{4})',
-    ]
-    for pat in period_patterns:
-        match = re.search(pat, text, re.IGNORECASE)
+    for rx in _PERIOD_PATTERNS:
+        match = rx.search(text)
         if match:
             groups = [g for g in match.groups() if g]
             if len(groups) > 1:
@@ -710,23 +1133,42 @@ def _extract_period_generic(text: str) -> Optional[str]:
     return None
 
 
+# ── Mémoïsation par texte (vidée en fin d'extraction) ──
+# Clé id(text) ; l'entrée garde le texte pour qu'un id réutilisé ne renvoie
+# jamais le résultat d'un autre texte.
+_PERIOD_CACHE: Dict[int, Tuple[str, Optional[str]]] = {}
+_FOURNISSEUR_CACHE: Dict[int, Tuple[str, Optional[str]]] = {}
+
+
+def _memoized(cache: Dict[int, Tuple[str, Any]], fn, text: str):
+    entry = cache.get(id(text))
+    if entry is not None and entry[0] is text:
+        return entry[1]
+    result = fn(text)
+    cache[id(text)] = (text, result)
+    return result
+
+
+def _extract_period_cached(text: str) -> Optional[str]:
+    return _memoized(_PERIOD_CACHE, _extract_period_generic, text)
+
+
+def _detect_fournisseur_cached(text_lower: str) -> Optional[str]:
+    return _memoized(_FOURNISSEUR_CACHE, _detect_fournisseur, text_lower)
+
+
 def _extract_references_generic(text: str, text_lower: str) -> Tuple[Optional[str], Optional[str]]:
     ref_facture = None
     ref_client = None
 
-    for pat in [
-        r'(?:r[ée]f[ée]rence|n[°o\.]\s*facture|invoice\s*(?:no?|#)|رقم\s*الفاتورة)\s*[:\s]*([\w\d/\-]+)',
-        r'(?:facture\s*n[°o])\s*[:\s]*([\w\d/\-]+)',
-    ]:
-        m = re.search(pat, text, re.IGNORECASE)
+    for rx in _REF_FACTURE_PATTERNS:
+        m = rx.search(text)
         if m:
             ref_facture = m.group(1).strip()
             break
 
-    for pat in [
-        r'(?:r[ée]f[ée]rence\s*client|n[°o\.]\s*client|n[°o\.]\s*abonn[ée]|n[°o\.]\s*compteur|customer\s*(?:no?|#|ref)|رقم\s*العميل|رقم\s*المشترك)\s*[:\s]*([\w\d/\-]+)',
-    ]:
-        m = re.search(pat, text, re.IGNORECASE)
+    for rx in _REF_CLIENT_PATTERNS:
+        m = rx.search(text)
         if m:
             ref_client = m.group(1).strip()
             break
@@ -735,244 +1177,220 @@ def _extract_references_generic(text: str, text_lower: str) -> Tuple[Optional[st
 
 
 def _extract_address_generic(text: str) -> Optional[str]:
-    for pat in [
-        r'(?:adresse|address|عنوان)\s*[:\s]*(.{10,80}?)(?:\n|$)',
-        r'((?:نهج|شارع|حي|طريق)\s+.{5,60})',
-        r'((?:rue|avenue|boulevard|bd|impasse)\s+.{5,60})',
-    ]:
-        m = re.search(pat, text, re.IGNORECASE)
+    for rx, grp in _ADDRESS_PATTERNS:
+        m = rx.search(text)
         if m:
-            addr = re.sub(r'\s+', ' ', m.group(0 if '(' not in pat[:5] else 1).strip())
+            addr = _RE_WHITESPACE.sub(' ', m.group(grp).strip())
             if len(addr) > 10:
                 return addr
     return None
 
 
-def _extract_consumption_generic(text: str, text_lower: str) -> List[DonneeEnvironnementale]:
+def _iter_consumption_values(raws: Iterable[str], lo: float, hi: float) -> Iterator[str]:
+    """Normalise, filtre par plage et dédoublonne les valeurs brutes d'une famille.
+
+    Le dédoublonnage porte sur la valeur numérique (« 1000 » et « 1000.00 »
+    ne font qu'un) ; une chaîne déjà retenue est écartée avant `float()`.
+    """
+    seen: set = set()
+    seen_f: set = set()
+    for raw in raws:
+        val = raw.translate(_NUM_TRANS)
+        if val in seen:
+            continue
+        try:
+            fv = float(val)
+        except ValueError:
+            continue
+        if fv < lo or fv > hi or fv in seen_f:
+            continue
+        seen.add(val)
+        seen_f.add(fv)
+        yield val
+
+
+def _extract_consumption_generic(text: str, text_lower_lines: str) -> List[DonneeEnvironnementale]:
+    """Consommations kWh / m³ / litres, balayées sur `text_lower_lines` (sauts de ligne conservés).
+
+    `\s` franchit un saut de ligne : « Index 15441\n400 m3 » donne « 15441\n400 »,
+    rejeté car non numérique, et non 15441400 m³ comme sur le texte aplati.
+    """
     donnees: List[DonneeEnvironnementale] = []
 
     # ── kWh ──
-    kwh_patterns = [
-        r'([\d\s.,]+)\s*(kwh)',
-        r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(kwh)',
-        r'[ée]nergie[:\s]*(?:consomm[ée]e)?[:\s]*([\d\s.,]+)\s*(kwh)',
-        r'total[:\s]*([\d\s.,]+)\s*(kwh)',
-        r'quantit[ée]\s*(?:\(\d\))?\s+(\d+)',
-        r'استهلاك[:\s]*([\d\s.,]+)\s*(kwh|ك\.?و\.?س|كيلوواط)',
-        r'طاقة[:\s]*([\d\s.,]+)\s*(kwh|ك\.?و\.?س)',
-        r'([\d\s.,]+)\s*(ك\.?و\.?س|كيلوواط)',
-    ]
-    seen_kwh: set = set()
-    for pat in kwh_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                fv = float(val)
-                if fv < 1 or fv > 100_000:
-                    continue
-            except ValueError:
-                continue
-            if val not in seen_kwh:
-                seen_kwh.add(val)
-                donnees.append(DonneeEnvironnementale(
-                    champ="Énergie consommée", valeur=val, unite="kWh", confiance=0.80
-                ))
+    kwh_raw = chain(
+        _iter_fused_values(_RE_KWH_ALL, _KWH_DISPATCH, text_lower_lines),
+        (m.group(1) for m in _RE_KWH_QUANTITE.finditer(text_lower_lines)),
+    )
+    for val in _iter_consumption_values(kwh_raw, 1, 100_000):
+        donnees.append(DonneeEnvironnementale(
+            champ=_CHAMP_ENERGIE, valeur=val, unite=_UNITE_KWH, confiance=0.80
+        ))
 
     # ── m³ ──
-    m3_patterns = [
-        r'([\d\s.,]+)\s*(m[³3]|m\s*cube)',
-        r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(m[³3])',
-        r'volume[:\s]*([\d\s.,]+)\s*(m[³3])',
-        r'([\d\s.,]+)\s*(متر\s*مكعب|م[³3])',
-        r'استهلاك[:\s]*([\d\s.,]+)\s*(م[³3]|m[³3])',
-    ]
-    seen_m3: set = set()
-    for pat in m3_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                float(val)
-            except ValueError:
-                continue
-            if val not in seen_m3:
-                seen_m3.add(val)
-                label = "Volume consommé (eau)" if ("eau" in text_lower or "sonede" in text_lower) else "Volume consommé (gaz)"
-                donnees.append(DonneeEnvironnementale(
-                    champ=label, valeur=val, unite="m³", confiance=0.80
-                ))
+    label_m3 = (
+        _CHAMP_VOLUME_EAU if ("eau" in text_lower_lines or "sonede" in text_lower_lines) else _CHAMP_VOLUME_GAZ
+    )
+    m3_raw = _iter_fused_values(_RE_M3_ALL, _M3_DISPATCH, text_lower_lines)
+    for val in _iter_consumption_values(m3_raw, float("-inf"), float("inf")):
+        donnees.append(DonneeEnvironnementale(
+            champ=label_m3, valeur=val, unite=_UNITE_M3, confiance=0.80
+        ))
 
     # ── Litres ──
-    litre_patterns = [
-        r'([\d\s.,]+)\s*(litres?|l\b)',
-        r'quantit[ée][:\s]*([\d\s.,]+)\s*(litres?|l\b)',
-        r'volume[:\s]*([\d\s.,]+)\s*(litres?|l\b)',
-        r'([\d\s.,]+)\s*(لتر)',
-        r'كمية[:\s]*([\d\s.,]+)\s*(لتر|litres?)',
-    ]
-    seen_l: set = set()
-    for pat in litre_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                fv = float(val)
-                if fv < 0.1 or fv > 100_000:
-                    continue
-            except ValueError:
-                continue
-            if val not in seen_l:
-                seen_l.add(val)
-                donnees.append(DonneeEnvironnementale(
-                    champ="Volume carburant", valeur=val, unite="litres", confiance=0.75
-                ))
+    litre_raw = _iter_fused_values(_RE_LITRE_ALL, _LITRE_DISPATCH, text_lower_lines)
+    for val in _iter_consumption_values(litre_raw, 0.1, 100_000):
+        donnees.append(DonneeEnvironnementale(
+            champ=_CHAMP_VOLUME_CARBURANT, valeur=val, unite=_UNITE_LITRES, confiance=0.75
+        ))
 
     return donnees
 
 
-def _extract_amounts_generic(text: str) -> List[DonneeEnvironnementale]:
-    donnees: List[DonneeEnvironnementale] = []
-
-    amount_patterns = [
-        (r'montant\s*(?:à|a)\s*payer[:\s]*([\d\s.,]+)', "Montant à payer", 0.90),
-        (r'([\d]+[.,]\d{3})\s+montant\s*(?:à|a)\s*payer', "Montant à payer", 0.90),
-        (r'net\s*(?:à|a)\s*payer[:\s]*([\d\s.,]+)\s*(dt|tnd|€|eur|dinars?|euros?)', "Net à payer", 0.85),
-        (r'total\s*ttc[:\s]*([\d\s.,]+)\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Total TTC", 0.85),
-        (r'montant\s*total[:\s]*([\d\s.,]*\d)', "Montant total", 0.80),
-        (r'montant[:\s]*([\d\s.,]+)\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Montant facture", 0.75),
-        (r'total[:\s]*([\d\s.,]+)\s*(dt|tnd|€|eur|dinars?|euros?|\$|usd)', "Total", 0.70),
-        (r'المبلغ[:\s]*([\d\s.,]+)\s*(د\.?ت|dt|tnd|دينار)', "Montant (المبلغ)", 0.80),
-        (r'المجموع[:\s]*([\d\s.,]+)\s*(د\.?ت|dt|tnd|دينار)', "Total (المجموع)", 0.75),
-        (r'الصافي[:\s]*([\d\s.,]+)\s*(د\.?ت|dt|tnd|دينار)', "Net (الصافي)", 0.85),
-    ]
+# ── Préfiltre littéral ──
+# Chaque variante d'une alternance contient obligatoirement l'un de ces
+# littéraux : si aucun n'apparaît dans texte_lower, le balayage est sauté.
+_FAMILY_LITERALS: Dict[str, Tuple[str, ...]] = {
+    "montants": ("montant", "net", "total", "المبلغ", "المجموع", "الصافي"),
+    "co2": ("co2", "co₂", "carbone", "émission", "emission", "empreinte"),
+}
 
-    seen: set = set()
-    for pat, champ, conf in amount_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                fval = float(val)
-                if fval < 0.01:
-                    continue
-            except ValueError:
-                continue
-            if val not in seen:
-                seen.add(val)
-                devise = _detect_devise(match.groups())
-                donnees.append(DonneeEnvironnementale(
-                    champ=champ, valeur=val, unite=devise, confiance=conf
-                ))
-    return donnees
 
+def _family_present(family: str, text: str, text_lower: str) -> bool:
+    """Vrai si un littéral de `family` apparaît (ou si texte_lower n'est pas fiable).
 
-def _detect_devise(groups: tuple) -> str:
-    for g in groups:
-        if not g:
-            continue
-        gl = g.lower().strip()
-        if gl in ("€", "eur", "euros", "euro"):
-            return "EUR"
-        if gl in ("$", "usd"):
-            return "USD"
-        if gl in ("dt", "tnd", "dinar", "dinars", "د.ت", "دت", "دينار"):
-            return "DT"
-    return "DT"
+    Quelques `in` (recherche C, arrêt au premier hit) coûtent moins qu'un
+    passage Aho–Corasick qui énumère toutes les occurrences en Python.
+    """
+    if not _lower_is_faithful(text, text_lower):
+        return True
+    return any(lit in text_lower for lit in _FAMILY_LITERALS[family])
 
 
-def _extract_co2_direct(text: str) -> List[DonneeEnvironnementale]:
+def _extract_amounts_generic(text: str, text_lower_lines: str) -> List[DonneeEnvironnementale]:
     donnees: List[DonneeEnvironnementale] = []
-    co2_patterns = [
-        r'(?:co2|co₂|carbone|émissions?|emissions?)[:\s]*([\d\s.,]+)\s*(kg|tonnes?|t\b|g\b)',
-        r'([\d\s.,]+)\s*(kg|tonnes?|t)\s*(?:de\s+)?(?:co2|co₂|carbone)',
-        r'empreinte\s*carbone[:\s]*([\d\s.,]+)\s*(kg|tonnes?|t)',
-    ]
-    for pat in co2_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            unite = match.group(2).lower()
-            unite = "tonnes CO₂" if unite in ("t", "tonnes", "tonne") else "kg CO₂"
-            try:
-                float(val)
-            except ValueError:
+    seen_f: set = set()
+    if not _family_present("montants", text, text_lower_lines):
+        return donnees
+    if _lower_is_faithful(text, text_lower_lines):
+        rx, subject = _RE_AMOUNT_ALL, text_lower_lines
+    else:
+        rx, subject = _RE_AMOUNT_ALL_CI, text
+    for rank, groups in _iter_by_pattern(rx, _AMOUNT_DISPATCH, subject):
+        _, champ, conf = _AMOUNT_SPECS[rank]
+        val = groups[0].translate(_NUM_TRANS)
+        try:
+            fval = float(val)
+            if fval < 0.01:
                 continue
+        except ValueError:
+            continue
+        if fval not in seen_f:
+            seen_f.add(fval)
+            devise = _UNITE_DT
+            if len(groups) > 1 and groups[1]:
+                devise = _DEVISE_MAP.get(groups[1].lower(), _UNITE_DT)
             donnees.append(DonneeEnvironnementale(
-                champ="Émissions CO₂ (déclarées)", valeur=val, unite=unite, confiance=0.90
+                champ=champ, valeur=val, unite=devise, confiance=conf
             ))
     return donnees
 
 
+_DEVISE_EUR = frozenset(("€", "eur", "euros", "euro"))
+_DEVISE_USD = frozenset(("$", "usd"))
+_DEVISE_DT = frozenset(("dt", "tnd", "dinar", "dinars", "د.ت", "دت", "دينار"))
+
+
+# Devise capturée (2e groupe des patterns suffixés) → code ; DT par défaut
+_DEVISE_MAP = {
+    **dict.fromkeys(_DEVISE_EUR, "EUR"),
+    **dict.fromkeys(_DEVISE_USD, "USD"),
+    **dict.fromkeys(_DEVISE_DT, _UNITE_DT),
+}
+
+
+def _extract_co2_direct(text: str, text_lower_lines: str) -> List[DonneeEnvironnementale]:
+    donnees: List[DonneeEnvironnementale] = []
+    if not _family_present("co2", text, text_lower_lines):
+        return donnees
+    if _lower_is_faithful(text, text_lower_lines):
+        rx, subject = _RE_CO2_ALL, text_lower_lines
+    else:
+        rx, subject = _RE_CO2_ALL_CI, text
+    for _, groups in _iter_by_pattern(rx, _CO2_DISPATCH, subject):
+        val = groups[0].translate(_NUM_TRANS)
+        unite = groups[1].lower()
+        unite = "tonnes CO₂" if unite in ("t", "tonnes", "tonne") else "kg CO₂"
+        try:
+            float(val)
+        except ValueError:
+            continue
+        donnees.append(DonneeEnvironnementale(
+            champ="Émissions CO₂ (déclarées)", valeur=val, unite=unite, confiance=0.90
+        ))
+    return donnees
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 #  CALCUL CO₂ COMBINÉ
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Unité de consommation → clé du facteur d'émission à appliquer
+_FACTEUR_PAR_UNITE = {
+    _UNITE_KWH: "facteur_kg_co2_par_kwh",
+    _UNITE_M3: "facteur_kg_co2_par_m3",
+    _UNITE_LITRES: "facteur_kg_co2_par_litre",
+}
+_CARB_SET = frozenset(("essence", "diesel", "gpl"))
+
+
 def _calculate_co2_combined(
     donnees: List[DonneeEnvironnementale],
     types_energie: List[str],
-) -> Tuple[Optional[float], List[Dict[str, Any]], Optional[str], Optional[str]]:
+) -> Tuple[Optional[float], List[CO2Detail], Optional[str], Optional[str]]:
     """Calcule CO₂ pour CHAQUE type d'énergie séparément."""
     total_co2 = 0.0
-    detail: List[Dict[str, Any]] = []
+    detail: List[CO2Detail] = []
+    carb_default = next((t for t in types_energie if t in _CARB_SET), "essence")
+    types_set = frozenset(types_energie)
 
     for d in donnees:
-        try:
-            val = float(d.valeur) if d.valeur else 0
-        except (ValueError, TypeError):
+        val = d._val_float
+        if val is None or val <= 0:
             continue
-        if val <= 0:
+
+        unite = d.unite
+        if d._kind == "conso_kwh":  # unité kWh
+            if "electricite" not in types_set:
+                continue
+            cat = "electricite"
+        elif unite == _UNITE_M3:
+            champ_l = d._champ_lower
+            if "gaz" in champ_l:
+                cat = "gaz_naturel"
+            elif "eau" in champ_l:
+                cat = "eau"
+            else:
+                continue
+        elif unite == _UNITE_LITRES:
+            cat = carb_default
+        else:
             continue
 
-        # Électricité (kWh)
-        if d.unite == "kWh" and "electricite" in types_energie:
-            f = EMISSION_FACTORS["electricite"]
-            co2 = val * f["facteur_kg_co2_par_kwh"]
-            detail.append({
-                "type": "electricite", "consommation": val, "unite": "kWh",
-                "facteur": f["facteur_kg_co2_par_kwh"],
-                "co2_kg": round(co2, 3), "source": f["source"],
-            })
-            total_co2 += co2
-
-        # Gaz (m³)
-        elif d.unite == "m³" and "gaz" in d.champ.lower():
-            f = EMISSION_FACTORS["gaz_naturel"]
-            co2 = val * f["facteur_kg_co2_par_m3"]
-            detail.append({
-                "type": "gaz_naturel", "consommation": val, "unite": "m³",
-                "facteur": f["facteur_kg_co2_par_m3"],
-                "co2_kg": round(co2, 3), "source": f["source"],
-            })
-            total_co2 += co2
-
-        # Eau (m³)
-        elif d.unite == "m³" and "eau" in d.champ.lower():
-            f = EMISSION_FACTORS["eau"]
-            co2 = val * f["facteur_kg_co2_par_m3"]
-            detail.append({
-                "type": "eau", "consommation": val, "unite": "m³",
-                "facteur": f["facteur_kg_co2_par_m3"],
-                "co2_kg": round(co2, 3), "source": f["source"],
-            })
-            total_co2 += co2
-
-        # Carburant (litres)
-        elif d.unite == "litres":
-            carb_type = "essence"
-            for t in types_energie:
-                if t in ("essence", "diesel", "gpl"):
-                    carb_type = t
-                    break
-            f = EMISSION_FACTORS[carb_type]
-            co2 = val * f["facteur_kg_co2_par_litre"]
-            detail.append({
-                "type": carb_type, "consommation": val, "unite": "litres",
-                "facteur": f["facteur_kg_co2_par_litre"],
-                "co2_kg": round(co2, 3), "source": f["source"],
-            })
-            total_co2 += co2
+        f = EMISSION_FACTORS[cat]
+        facteur = f[_FACTEUR_PAR_UNITE[unite]]
+        co2 = val * facteur
+        detail.append(CO2Detail(
+            type=cat, consommation=val, unite=unite,
+            facteur=facteur, co2_kg=round(co2, 3), source=f["source"],
+        ))
+        total_co2 += co2
 
     if total_co2 == 0:
         return None, [], None, None
 
-    sources = list({d["source"] for d in detail})
-    facteurs = " + ".join(f'{d["facteur"]} kg CO₂/{d["unite"]}' for d in detail)
+    sources = list(dict.fromkeys(d.source for d in detail))
+    facteurs = " + ".join([f"{d.facteur} kg CO₂/{d.unite}" for d in detail])
     return round(total_co2, 3), detail, facteurs, " ; ".join(sources)
 
 
@@ -980,6 +1398,15 @@ def _calculate_co2_combined(
 #  VALIDATION CROISÉE & SCORING
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _parse_iso_date(parts: Tuple[str, str, str]) -> datetime:
+    """(année, mois, jour) → datetime ; ValueError si la date est invalide."""
+    try:
+        return datetime.fromisoformat("-".join(parts))
+    except ValueError:
+        # fromisoformat n'accepte que des chiffres ASCII ; \d capture aussi ٠-٩
+        return datetime(int(parts[0]), int(parts[1]), int(parts[2]))
+
+
 def _cross_validate(result: ResultatExtraction) -> List[str]:
     """Valide la cohérence entre données extraites."""
     alertes: List[str] = []
@@ -989,15 +1416,15 @@ def _cross_validate(result: ResultatExtraction) -> List[str]:
     montant_total = None
 
     for d in result.donnees:
-        try:
-            val = float(d.valeur) if d.valeur else 0
-        except (ValueError, TypeError):
+        val = d._val_float
+        if val is None or not val > 0:  # écarte aussi NaN
             continue
-        if d.unite == "kWh" and val > 0:
+        kind = d._kind
+        if kind == "conso_kwh":
             conso_kwh = val
-        elif "payer" in d.champ.lower() and val > 0:
+        elif kind == "montant_payer":
             montant_payer = val
-        elif d.champ.lower() in ("montant total", "montant total ht", "total ttc") and d.unite in ("DT", "EUR", "USD") and val > 0:
+        elif kind == "montant_total":
             montant_total = val
 
     # Use best available montant for validation
@@ -1027,11 +1454,11 @@ def _cross_validate(result: ResultatExtraction) -> List[str]:
 
     # Période cohérente
     if result.periode:
-        dates = re.findall(r'(\d{4})-(\d{2})-(\d{2})', result.periode)
+        dates = _RE_DATE_ISO_PARTS.findall(result.periode)
         if len(dates) >= 2:
             try:
-                d1 = datetime(int(dates[0][0]), int(dates[0][1]), int(dates[0][2]))
-                d2 = datetime(int(dates[1][0]), int(dates[1][1]), int(dates[1][2]))
+                d1 = _parse_iso_date(dates[0])
+                d2 = _parse_iso_date(dates[1])
                 delta = (d2 - d1).days
                 if delta < 0:
                     alertes.append("⚠ Période inversée")
@@ -1045,6 +1472,9 @@ def _cross_validate(result: ResultatExtraction) -> List[str]:
     return alertes
 
 
+_UNITES_CONSO = frozenset((_UNITE_KWH, _UNITE_M3, _UNITE_LITRES))
+
+
 def _calculate_global_score(result: ResultatExtraction) -> float:
     """Score de confiance global 0-1."""
     score = 0.0
@@ -1060,13 +1490,20 @@ def _calculate_global_score(result: ResultatExtraction) -> float:
         score += weights["fournisseur"]
     if result.periode:
         score += weights["periode"]
-    if any(d.unite in ("kWh", "m³", "litres") for d in result.donnees):
-        conso_conf = max(
-            (d.confiance for d in result.donnees if d.unite in ("kWh", "m³", "litres")),
-            default=0
-        )
+
+    # Un seul passage : meilleure confiance de consommation et présence d'un montant
+    conso_conf = None
+    has_montant = False
+    for d in result.donnees:
+        if d.unite in _UNITES_CONSO:
+            if conso_conf is None or d.confiance > conso_conf:
+                conso_conf = d.confiance
+        if not has_montant:
+            champ_l = d._champ_lower
+            has_montant = "montant" in champ_l or "payer" in champ_l
+    if conso_conf is not None:
         score += weights["conso"] * conso_conf
-    if any("montant" in d.champ.lower() or "payer" in d.champ.lower() for d in result.donnees):
+    if has_montant:
         score += weights["montant"]
     if result.emission_co2_kg is not None:
         score += weights["co2"]
@@ -1082,6 +1519,17 @@ def _calculate_global_score(result: ResultatExtraction) -> float:
 #  FONCTION PRINCIPALE
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Résultats par empreinte du texte OCR, pour les documents ré-analysés à l'identique.
+# Le texte lui-même n'est pas gardé ; au-delà de _RESULT_CACHE_MAX entrées, la moins
+# récemment utilisée est retirée.
+_RESULT_CACHE: "OrderedDict[bytes, ResultatExtraction]" = OrderedDict()
+_RESULT_CACHE_MAX = 256
+
+
+def _text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
 def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
     """
     Pipeline v2 :
@@ -1090,12 +1538,55 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
     """
     if not texte_ocr or not texte_ocr.strip():
         return ResultatExtraction(resume="Aucun texte à analyser.")
+    key = _text_digest(texte_ocr)
+    result = _RESULT_CACHE.get(key)
+    if result is None:
+        try:
+            result = _run_pipeline(texte_ocr)
+        finally:
+            _PERIOD_CACHE.clear()
+            _FOURNISSEUR_CACHE.clear()
+        _RESULT_CACHE[key] = result
+        if len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+            _RESULT_CACHE.popitem(last=False)
+    else:
+        _RESULT_CACHE.move_to_end(key)
+    return _copy_result(result)
+
+
+def batch_extraire(textes: List[str], workers: Optional[int] = None) -> List[ResultatExtraction]:
+    """Analyse plusieurs textes OCR en parallèle (un processus par cœur par défaut).
+
+    Les résultats sont rendus dans l'ordre des textes.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(textes) < 2:
+        return [extraire_donnees_environnementales(t) for t in textes]
+    chunksize = max(1, len(textes) // workers // 4)
+    with ProcessPoolExecutor(workers) as ex:
+        return list(ex.map(extraire_donnees_environnementales, textes, chunksize=chunksize))
+
+
+def _copy_result(r: ResultatExtraction) -> ResultatExtraction:
+    """Copie indépendante d'un résultat mis en cache (données figées partagées, lignes CO₂ copiées)."""
+    return replace(
+        r,
+        donnees=list(r.donnees),
+        types_energie=list(r.types_energie),
+        detail_co2=[dict(info) for info in r.detail_co2],
+        alertes=list(r.alertes),
+    )
+
 
-    text_lower = _normalize(texte_ocr)
+def _run_pipeline(texte_ocr: str) -> ResultatExtraction:
+    # Une seule mise en minuscules : sauts de ligne conservés pour les consommations,
+    # montants et CO₂ ; version aplatie pour les mots-clés et les zones
+    text_lower_lines = texte_ocr.lower()
+    text_lower = _normalize(text_lower_lines)
     result = ResultatExtraction()
 
     # 1. Fournisseur
-    result.fournisseur = _detect_fournisseur(text_lower)
+    result.fournisseur = _detect_fournisseur_cached(text_lower)
 
     # 2. Types d'énergie (TOUS)
     result.types_energie = _detect_all_types(text_lower)
@@ -1103,13 +1594,13 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
 
     # 3. Zones + Stratégie
     if result.fournisseur == "STEG":
-        zones = _parse_zones_steg(texte_ocr, text_lower)
+        zones = _parse_zones_steg(texte_ocr, text_lower, text_lower_lines)
         strategy: ExtractionStrategy = STEGStrategy(zones)
     elif result.fournisseur == "SONEDE":
-        zones = _parse_zones_sonede(texte_ocr, text_lower)
+        zones = _parse_zones_sonede(texte_ocr, text_lower, text_lower_lines)
         strategy = SONEDEStrategy(zones)
     else:
-        zones = _parse_zones_generic(texte_ocr, text_lower)
+        zones = _parse_zones_generic(texte_ocr, text_lower, text_lower_lines)
         strategy = GenericStrategy(zones)
 
     # 4. Extraction structurée
@@ -1129,10 +1620,12 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
 
     result.donnees.extend(strategy.extract_consumption())
     result.donnees.extend(strategy.extract_amounts())
-    result.donnees.extend(_extract_co2_direct(texte_ocr))
+    co2_declare = _extract_co2_direct(texte_ocr, text_lower_lines)
+    result.donnees.extend(co2_declare)
 
     # 5. CO₂ combiné
-    has_declared = any("déclar" in d.champ.lower() for d in result.donnees)
+    # Seul _extract_co2_direct produit des champs « déclarées »
+    has_declared = bool(co2_declare)
     total_co2, detail, facteur_str, source = _calculate_co2_combined(
         result.donnees, result.types_energie
     )
@@ -1141,13 +1634,13 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
         result.emission_co2_kg = total_co2
         result.facteur_emission_utilise = facteur_str
         result.source_facteur = source
-        result.detail_co2 = detail
+        result.detail_co2 = [d_info.to_dict() for d_info in detail]
 
         if not has_declared:
             for d_info in detail:
                 result.donnees.append(DonneeEnvironnementale(
-                    champ=f"Émissions CO₂ ({d_info['type']})",
-                    valeur=str(d_info["co2_kg"]),
+                    champ=f"Émissions CO₂ ({d_info.type})",
+                    valeur=str(d_info.co2_kg),
                     unite="kg CO₂",
                     confiance=0.75,
                 ))
@@ -1168,30 +1661,32 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
 #  HELPERS & RÉSUMÉ
 # ═══════════════════════════════════════════════════════════════════════════════
 
+_ENERGY_LABELS = {
+    "electricite": "Électricité (réseau)",
+    "gaz_naturel": "Gaz naturel",
+    "eau": "Eau potable (+ assainissement)",
+    "essence": "Essence (carburant)",
+    "diesel": "Diesel / Gasoil",
+    "gpl": "GPL",
+    "inconnu": "Non identifié",
+}
+
+_TYPE_LABELS = {
+    "electricite": "[ELEC]", "gaz_naturel": "[GAZ]",
+    "eau": "[EAU]", "essence": "[CARB]", "diesel": "[CARB]",
+    "gpl": "[GPL]", "inconnu": "[?]",
+}
+
+
 def _get_energy_labels(types: List[str]) -> str:
-    labels = {
-        "electricite": "Électricité (réseau)",
-        "gaz_naturel": "Gaz naturel",
-        "eau": "Eau potable (+ assainissement)",
-        "essence": "Essence (carburant)",
-        "diesel": "Diesel / Gasoil",
-        "gpl": "GPL",
-        "inconnu": "Non identifié",
-    }
-    parts = [labels.get(t, t) for t in types if t != "inconnu"]
+    parts = [_ENERGY_LABELS.get(t, t) for t in types if t != "inconnu"]
     return " + ".join(parts) if parts else "Non identifié"
 
 
 def _generer_resume(r: ResultatExtraction) -> str:
     lines: List[str] = []
 
-    type_labels = {
-        "electricite": "[ELEC]", "gaz_naturel": "[GAZ]",
-        "eau": "[EAU]", "essence": "[CARB]", "diesel": "[CARB]",
-        "gpl": "[GPL]", "inconnu": "[?]",
-    }
-
-    tags = [type_labels.get(t, f"[{t.upper()}]") for t in r.types_energie]
+    tags = [_TYPE_LABELS.get(t, f"[{t.upper()}]") for t in r.types_energie]
     lines.append(f"{' '.join(tags)} Facture {_get_energy_labels(r.types_energie)}")
 
     if r.fournisseur:
@@ -1207,11 +1702,10 @@ def _generer_resume(r: ResultatExtraction) -> str:
 
     lines.append("")
 
-    for d in r.donnees:
-        if d.valeur:
-            u = f" {d.unite}" if d.unite else ""
-            conf = f" [{d.confiance*100:.0f}%]"
-            lines.append(f"  • {d.champ} : {d.valeur}{u}{conf}")
+    lines.extend(
+        f"  • {d.champ} : {d.valeur}{' ' + d.unite if d.unite else ''} [{d.confiance * 100:.0f}%]"
+        for d in r.donnees if d.valeur
+    )
 
     if r.detail_co2:
         lines.append("")
@@ -1251,13 +1745,29 @@ def _generer_resume(r: ResultatExtraction) -> str:
 #  CLI
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _lire_fichier_texte(path: str) -> str:
+    """Lit un fichier OCR UTF-8 ; le fichier est fermé avant toute analyse.
+
+    Le contenu est décodé directement depuis le mmap, sans copie `bytes`
+    intermédiaire. Les fins de ligne sont normalisées comme en mode texte.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            return ""
+    with mm:
+        texte = str(mm, "utf-8")
+    if "\r" in texte:
+        texte = texte.replace("\r\n", "\n").replace("\r", "\n")
+    return texte
+
+
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) < 2:
         print("Usage: python extractor.py <fichier_texte_ocr>")
         sys.exit(1)
-    with open(sys.argv[1], encoding="utf-8") as f:
-        texte = f.read()
+    texte = _lire_fichier_texte(sys.argv[1])
     res = extraire_donnees_environnementales(texte)
     print(res.resume)
     print("\n─── JSON ───")
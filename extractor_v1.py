@@ -5,10 +5,27 @@ Analyse le texte OCR d'une facture (électricité, gaz, eau, transport, carburan
 et extrait UNIQUEMENT les données pertinentes pour le calcul du bilan carbone / ESG.
 """
 
+import os
 import re
+import sys
 import json
-from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple, Iterator
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
+
+# RE2 (temps linéaire), alternances fusionnées, Aho–Corasick : partagés avec extractor
+from pattern_utils import (
+    build_automaton as _build_automaton,
+    fuse_patterns,
+    iter_by_pattern as _iter_by_pattern,
+    lower_is_faithful as _lower_is_faithful,
+    portable_atomic as _portable_atomic,
+)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -101,9 +118,26 @@ _TYPE_KEYWORDS = {
         "\u0628\u0631\u0648\u0628\u0627\u0646",             # بروبان
     ],
 }
+# Ensembles figés : le score d'un type = nombre de ses mots-clés présents
+_TYPE_KEYWORDS: Dict[str, frozenset] = {k: frozenset(v) for k, v in _TYPE_KEYWORDS.items()}
+
+# Écriture arabe : un texte qui n'en contient aucun caractère ne peut matcher
+# ni les mots-clés arabes ni les patterns qui commencent par un mot arabe
+_ARABIC_RE = re.compile(r'[\u0600-\u06ff]')
+
+
+def _starts_arabic(pattern: str) -> bool:
+    """Vrai si le pattern commence par une lettre arabe (écrite \\uXXXX ou telle quelle)."""
+    first = chr(int(pattern[2:6], 16)) if pattern.startswith("\\u") else pattern[:1]
+    return _ARABIC_RE.match(first) is not None
 
 
-@dataclass
+_TYPE_KEYWORDS_LATIN: Dict[str, frozenset] = {
+    k: frozenset(kw for kw in v if not _ARABIC_RE.search(kw)) for k, v in _TYPE_KEYWORDS.items()
+}
+
+
+@dataclass(slots=True, frozen=True)
 class DonneeEnvironnementale:
     """Structure d'une donnée extraite pertinente pour le bilan carbone."""
     champ: str                        # Ex: "Énergie consommée"
@@ -111,8 +145,11 @@ class DonneeEnvironnementale:
     unite: Optional[str] = None       # Ex: "kWh"
     confiance: float = 0.0            # 0.0 à 1.0
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"champ": self.champ, "valeur": self.valeur, "unite": self.unite, "confiance": self.confiance}
+
 
-@dataclass
+@dataclass(slots=True)
 class ResultatExtraction:
     """Résultat complet de l'extraction environnementale."""
     type_facture: str = "inconnu"
@@ -125,13 +162,27 @@ class ResultatExtraction:
     resume: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        # Arrondir
-        if d.get("emission_co2_kg") is not None:
-            d["emission_co2_kg"] = round(d["emission_co2_kg"], 3)
-        return d
+        return self._to_mapping([d.to_dict() for d in self.donnees])
+
+    def _to_mapping(self, donnees: list) -> Dict[str, Any]:
+        # Champ par champ, dans l'ordre déclaré (comme asdict)
+        return {
+            "type_facture": self.type_facture,
+            "fournisseur": self.fournisseur,
+            "periode": self.periode,
+            "donnees": donnees,
+            # Arrondir
+            "emission_co2_kg": round(self.emission_co2_kg, 3) if self.emission_co2_kg is not None else None,
+            "facteur_emission_utilise": self.facteur_emission_utilise,
+            "source_facteur": self.source_facteur,
+            "resume": self.resume,
+        }
 
     def to_json(self, indent: int = 2) -> str:
+        # orjson n'indente qu'à 2 espaces : les autres indentations restent sur json.
+        # Il sérialise les DonneeEnvironnementale nativement (mêmes clés, même ordre).
+        if orjson is not None and indent == 2:
+            return orjson.dumps(self._to_mapping(self.donnees), option=orjson.OPT_INDENT_2).decode("utf-8")
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
 
 
@@ -141,51 +192,100 @@ class ResultatExtraction:
 
 def _normalize(text: str) -> str:
     """Normalise le texte pour la recherche."""
+    # lower() + replace() restent en C sans table : plus rapide qu'un
+    # str.translate() (repli de casse compris), même sur du texte ASCII
     return text.lower().replace("\n", " ").replace("\r", " ")
 
 
-def _detect_type(text_lower: str) -> str:
-    """Détecte le type de facture à partir du texte."""
-    scores: Dict[str, int] = {}
-    for type_name, keywords in _TYPE_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text_lower)
-        if score > 0:
-            scores[type_name] = score
+# Fournisseurs reconnus — testés dans l'ordre, le premier trouvé l'emporte
+_FOURNISSEURS: Dict[str, Tuple[str, ...]] = {
+    "STEG": ("steg",
+              "société tunisienne de l'électricité et du gaz",
+              "societe tunisienne de l electricite",
+              "société tunisienne du gaz",
+              "societe tunisienne du gaz",
+              "tunisienne du gaz",
+              "tunisienne de l'électricité",
+              "tunisienne de l electricite",
+              "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u062a\u0648\u0646\u0633\u064a\u0629 \u0644\u0644\u0643\u0647\u0631\u0628\u0627\u0621",  # الشركة التونسية للكهرباء
+              "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u062a\u0648\u0646\u0633\u064a\u0629 \u0644\u0644\u0643\u0647\u0631\u0628\u0627\u0621 \u0648\u0627\u0644\u063a\u0627\u0632",  # الشركة التونسية للكهرباء والغاز
+             ),
+    "SONEDE": ("sonede",
+                "société nationale d'exploitation et de distribution des eaux",
+                "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u0648\u0637\u0646\u064a\u0629 \u0644\u0627\u0633\u062a\u063a\u0644\u0627\u0644 \u0648\u062a\u0648\u0632\u064a\u0639 \u0627\u0644\u0645\u064a\u0627\u0647",  # الشركة الوطنية لاستغلال وتوزيع المياه
+               ),
+    "EDF": ("edf", "électricité de france"),
+    "Engie": ("engie",),
+    "TotalEnergies": ("totalenergies", "total energies"),
+    "Shell": ("shell",),
+}
 
-    if not scores:
-        return "inconnu"
-    return max(scores, key=scores.get)  # type: ignore[arg-type]
+# Un seul passage sur le texte pour tous les mots-clés (type / fournisseur)
+_TYPE_AC = _build_automaton(
+    (kw, kw) for keywords in _TYPE_KEYWORDS.values() for kw in keywords
+)
+_FOURNISSEUR_AC = _build_automaton(
+    (kw, name) for name, keywords in _FOURNISSEURS.items() for kw in keywords
+)
+_FOURNISSEURS_LATIN: Dict[str, Tuple[str, ...]] = {
+    name: tuple(kw for kw in keywords if not _ARABIC_RE.search(kw))
+    for name, keywords in _FOURNISSEURS.items()
+}
 
 
-def _detect_fournisseur(text_lower: str) -> Optional[str]:
+def _detect_type(text_lower: str, has_arabic: bool) -> str:
+    """Détecte le type de facture à partir du texte."""
+    hits = {kw for _, kw in _TYPE_AC.iter(text_lower)} if _TYPE_AC is not None else None
+    # Argmax en une passe ; « > » strict : à égalité le 1er type rencontré l'emporte
+    best_name, best_score = "inconnu", 0
+    keywords_by_type = _TYPE_KEYWORDS if has_arabic else _TYPE_KEYWORDS_LATIN
+    for type_name, keywords in keywords_by_type.items():
+        if hits is not None:
+            score = len(keywords & hits)
+        else:
+            # Sans pyahocorasick : sur des textes OCR de quelques Ko, ces `in`
+            # restent plus rapides qu'une alternance compilée sous `re`
+            score = sum(1 for kw in keywords if kw in text_lower)
+        if score > best_score:
+            best_name, best_score = type_name, score
+    return best_name
+
+
+def _detect_fournisseur(text_lower: str, has_arabic: bool) -> Optional[str]:
     """Detecte le fournisseur."""
-    fournisseurs = {
-        "STEG": ["steg",
-                  "société tunisienne de l'électricité et du gaz",
-                  "societe tunisienne de l electricite",
-                  "société tunisienne du gaz",
-                  "societe tunisienne du gaz",
-                  "tunisienne du gaz",
-                  "tunisienne de l'électricité",
-                  "tunisienne de l electricite",
-                  "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u062a\u0648\u0646\u0633\u064a\u0629 \u0644\u0644\u0643\u0647\u0631\u0628\u0627\u0621",  # الشركة التونسية للكهرباء
-                  "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u062a\u0648\u0646\u0633\u064a\u0629 \u0644\u0644\u0643\u0647\u0631\u0628\u0627\u0621 \u0648\u0627\u0644\u063a\u0627\u0632",  # الشركة التونسية للكهرباء والغاز
-                 ],
-        "SONEDE": ["sonede",
-                    "société nationale d'exploitation et de distribution des eaux",
-                    "\u0627\u0644\u0634\u0631\u0643\u0629 \u0627\u0644\u0648\u0637\u0646\u064a\u0629 \u0644\u0627\u0633\u062a\u063a\u0644\u0627\u0644 \u0648\u062a\u0648\u0632\u064a\u0639 \u0627\u0644\u0645\u064a\u0627\u0647",  # الشركة الوطنية لاستغلال وتوزيع المياه
-                   ],
-        "EDF": ["edf", "électricité de france"],
-        "Engie": ["engie"],
-        "TotalEnergies": ["totalenergies", "total energies"],
-        "Shell": ["shell"],
-    }
-    for name, keywords in fournisseurs.items():
+    if _FOURNISSEUR_AC is not None:
+        # Le 1er fournisseur (ordre du dictionnaire) trouvé l'emporte
+        hits = {name for _, name in _FOURNISSEUR_AC.iter(text_lower)}
+        for name in _FOURNISSEURS:
+            if name in hits:
+                return name
+        return None
+    if _FOURNISSEUR_RE is not None:
+        found = _first_by_pattern(_FOURNISSEUR_RE, _FOURNISSEUR_DISPATCH, text_lower)
+        return _FOURNISSEUR_NAMES[found[0]] if found else None
+    for name, keywords in (_FOURNISSEURS if has_arabic else _FOURNISSEURS_LATIN).items():
         if any(kw in text_lower for kw in keywords):
             return name
     return None
 
 
+# ── Nombres OCR ──
+# Deux .replace() restent plus rapides qu'un str.translate() sur ces chaînes
+# courtes, et un pré-filtre regex coûte plus cher que float() sur les valeurs
+# valides (majoritaires) : seul le try/except est factorisé ici.
+def _clean_number(raw: str) -> str:
+    """Nombre OCR nettoyé : espaces de milliers retirés, virgule → point."""
+    return raw.replace(" ", "").replace(",", ".")
+
+
+def _parse_number(val: str) -> Optional[float]:
+    """`float()` d'un nombre nettoyé, ou None s'il n'est pas numérique."""
+    try:
+        return float(val)
+    except ValueError:
+        return None
+
+
 def _extract_numbers_with_unit(text: str, patterns: List[str]) -> List[DonneeEnvironnementale]:
     """Extrait des nombres associés à des patterns (regex)."""
     results = []
@@ -194,241 +294,428 @@ def _extract_numbers_with_unit(text: str, patterns: List[str]) -> List[DonneeEnv
             groups = match.groups()
             if groups:
                 # Nettoyer le nombre: remplacer virgule par point, enlever espaces
-                raw_val = groups[0].replace(" ", "").replace(",", ".")
+                raw_val = _clean_number(groups[0])
                 unite = groups[1] if len(groups) > 1 else ""
                 results.append((raw_val, unite, match.group(0)))
     return results
 
 
-def _extract_consumption(text: str, text_lower: str) -> List[DonneeEnvironnementale]:
+def _fuse_patterns(patterns: List[str], flags: int = 0, ranks: Optional[List[int]] = None):
+    """`pattern_utils.fuse_patterns` sur le texte encodé en UTF-8 (RE2 si possible)."""
+    return fuse_patterns(patterns, flags, as_bytes=True, ranks=ranks)
+
+
+def _first_by_pattern(
+    rx, dispatch: Dict[int, Tuple[int, int, int]], text: str
+) -> Optional[Tuple[int, tuple]]:
+    """(rang, groupes) comme « pour chaque pattern : search, le premier qui matche gagne ».
+
+    Un seul balayage (reprise comme _iter_by_pattern) : on garde le match
+    de plus petit rang, et on s'arrête dès que le 1er pattern a matché.
+    """
+    as_bytes = isinstance(rx.pattern, bytes)
+    subject = text.encode("utf-8") if as_bytes else text
+    best: Optional[Tuple[int, tuple]] = None
+    pos = 0
+    while True:
+        m = rx.search(subject, pos)
+        if m is None:
+            break
+        rank, first, end = dispatch[m.lastindex]
+        if best is None or rank < best[0]:
+            best = (rank, m.groups()[first - 1:end - 1])
+            if rank == 0:
+                break
+        pos = m.start() + 1
+    if best is None or not as_bytes:
+        return best
+    return best[0], tuple(None if g is None else g.decode("utf-8") for g in best[1])
+
+
+# Sans pyahocorasick, fournisseurs en une seule alternance RE2 (un pattern
+# par fournisseur, aucun mot-clé n'est préfixe de celui d'un autre) ; sous
+# `re`, les tests `in` de _detect_fournisseur restent plus rapides.
+_FOURNISSEUR_RE, _FOURNISSEUR_DISPATCH = _fuse_patterns(
+    ["|".join(map(re.escape, keywords)) for keywords in _FOURNISSEURS.values()]
+)
+if not isinstance(_FOURNISSEUR_RE.pattern, bytes):
+    _FOURNISSEUR_RE = None
+_FOURNISSEUR_NAMES = tuple(_FOURNISSEURS)
+
+
+# Patterns compilés une fois au chargement du module : les formes « nombre +
+# unité » des trois familles sont lues par un seul balayage (_NUM_UNIT_RE),
+# les autres sont fusionnées par famille (voir _iter_by_pattern).
+# Patterns en minuscules, appliqués sans IGNORECASE à text.lower() ; la
+# variante _CI (sur le texte brut) ne sert que si la mise en minuscules
+# n'est pas fidèle (voir _lower_is_faithful).
+# ── kWh (électricité / gaz) ──
+_KWH_PATTERNS = [
+    r'([\d\s.,]+)\s*(kwh)',
+    r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(kwh)',
+    r'\u00e9nergie[:\s]*(?:consomm\u00e9e)?[:\s]*([\d\s.,]+)\s*(kwh)',
+    r'energie[:\s]*(?:consommee)?[:\s]*([\d\s.,]+)\s*(kwh)',
+    r'total[:\s]*([\d\s.,]+)\s*(kwh)',
+    # STEG : "Quantit\u00e9 (1)  400" -> only capture 1 standalone integer
+    r'quantit[\u00e9e]\s*(?:\(\d\))?\s+(\d+)',
+    # Arabe : استهلاك ... كو.س  / طاقة ... كو.س
+    r'\u0627\u0633\u062a\u0647\u0644\u0627\u0643[:\s]*([\d\s.,]+)\s*(kwh|\u0643\.?\u0648\.?\u0633|\u0643\u064a\u0644\u0648\u0648\u0627\u0637)',
+    r'\u0637\u0627\u0642\u0629[:\s]*([\d\s.,]+)\s*(kwh|\u0643\.?\u0648\.?\u0633)',
+    r'([\d\s.,]+)\s*(\u0643\.?\u0648\.?\u0633|\u0643\u064a\u0644\u0648\u0648\u0627\u0637)',
+]
+
+# ── m³ (gaz / eau) ──
+_M3_PATTERNS = [
+    r'([\d\s.,]+)\s*(m[\u00b33]|m\s*cube)',
+    r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(m[\u00b33])',
+    r'volume[:\s]*([\d\s.,]+)\s*(m[\u00b33])',
+    # Arabe : متر مكعب / م³
+    r'([\d\s.,]+)\s*(\u0645\u062a\u0631\s*\u0645\u0643\u0639\u0628|\u0645[\u00b33])',
+    r'\u0627\u0633\u062a\u0647\u0644\u0627\u0643[:\s]*([\d\s.,]+)\s*(\u0645[\u00b33]|m[\u00b33])',
+]
+
+# ── STEG gaz : section entre « Total Electricité » et « Total Gaz » ──
+_GAZ_SECTION_RE = re.compile(
+    r'(?:total\s*electricit[\u00e9e]|\u0645\u062c\u0645\u0648\u0639\s*\u0627\u0644\u0643\u0647\u0631\u0628\u0627\u0621)(.*?)(?:total\s*gaz|\u0645\u062c\u0645\u0648\u0639\s*\u0627\u0644\u063a\u0627\u0632)',
+    re.IGNORECASE | re.DOTALL
+)
+# Entiers PURS (pas partie d'un décimal) — reste sur `re` : le (?!\.\d)
+# fait reculer \d{2,5} (« 123.4 » donne « 12 »), ce que RE2 ne sait pas rendre
+_GAZ_INT_RE = re.compile(r'(?<![.\d])(\d{2,5})(?!\.\d)')
+
+# ── Litres (carburant) ──
+_LITRE_PATTERNS = [
+    r'([\d\s.,]+)\s*(litres?|l\b)',
+    r'quantit[\u00e9e][:\s]*([\d\s.,]+)\s*(litres?|l\b)',
+    r'volume[:\s]*([\d\s.,]+)\s*(litres?|l\b)',
+    # Arabe : لتر
+    r'([\d\s.,]+)\s*(\u0644\u062a\u0631)',
+    r'\u0643\u0645\u064a\u0629[:\s]*([\d\s.,]+)\s*(\u0644\u062a\u0631|litres?)',
+]
+
+# ── Nombre + unité (kWh / m³ / litres) ──
+# Toutes les unités commencent par une lettre : à une position donnée, le
+# nombre est suivi d'au plus une unité, donc d'au plus une famille.
+_NUM_UNIT_PREFIX = r'([\d\s.,]+)\s*('
+_CONSUMPTION_FAMILIES = (
+    ("kwh", _KWH_PATTERNS),
+    ("m3", _M3_PATTERNS),
+    ("litre", _LITRE_PATTERNS),
+)
+
+
+def _split_num_unit(patterns: List[str]) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """Sépare (rang, unité) des patterns « nombre + unité » et (rang, pattern) des autres."""
+    units, context = [], []
+    for rank, p in enumerate(patterns):
+        if p.startswith(_NUM_UNIT_PREFIX) and p.endswith(")"):
+            units.append((rank, p[len(_NUM_UNIT_PREFIX):-1]))
+        else:
+            context.append((rank, p))
+    return units, context
+
+
+def _build_consumption_scans(with_arabic: bool):
+    """(regex nombre + unité, sa variante _CI, son dispatch, [(famille, regex, regex _CI, dispatch)…]).
+
+    Sans `with_arabic`, les unités et patterns qui commencent par un mot
+    arabe sont écartés.
+    """
+    units: List[Tuple[str, int, str]] = []      # (famille, rang, unité)
+    scans = []
+    for family, patterns in _CONSUMPTION_FAMILIES:
+        family_units, context = _split_num_unit(patterns)
+        if not with_arabic:
+            # Une unité n'a pas de groupe : ses branches sont séparées par « | »
+            family_units = [
+                (rank, unit) for rank, unit in family_units
+                if not all(_starts_arabic(branch) for branch in unit.split("|"))
+            ]
+            context = [(rank, p) for rank, p in context if not _starts_arabic(p)]
+        units.extend((family, rank, unit) for rank, unit in family_units)
+        ranks = [rank for rank, _ in context]
+        rx, dispatch = _fuse_patterns([p for _, p in context], ranks=ranks)
+        rx_ci, _ = _fuse_patterns([p for _, p in context], re.IGNORECASE, ranks=ranks)
+        scans.append((family, rx, rx_ci, dispatch))
+    # l\b : reste sur `re`. N° du groupe de l'unité → (famille, rang).
+    # Aucune unité ne commence par [\d\s.,] : le nombre peut être atomique
+    # sans changer les matches, et un échec ne revient plus en arrière
+    # chiffre par chiffre (simple groupe avant Python 3.11).
+    pattern = _portable_atomic(
+        r'((?>[\d\s.,]+))\s*(?:' + "|".join(f"({unit})" for _, _, unit in units) + ")"
+    )
+    num_dispatch = {i + 2: (family, rank) for i, (family, rank, _) in enumerate(units)}
+    return re.compile(pattern), re.compile(pattern, re.IGNORECASE), num_dispatch, scans
+
+
+# Clé : le texte contient-il de l'arabe ?
+_CONSUMPTION_SCANS = {with_arabic: _build_consumption_scans(with_arabic) for with_arabic in (True, False)}
+
+
+def _iter_num_units(rx, dispatch: Dict[int, Tuple[str, int]], text: str) -> Iterator[Tuple[str, int, tuple]]:
+    """(famille, rang, (nombre, unité)) : mêmes matches que chaque pattern « nombre + unité » seul.
+
+    Même reprise que _iter_by_pattern ; la clé est le groupe de l'unité.
+    """
+    last_end: Dict[int, int] = {}
+    pos = 0
+    while True:
+        m = rx.search(text, pos)
+        if m is None:
+            break
+        key = m.lastindex
+        if m.start() >= last_end.get(key, 0):
+            last_end[key] = m.end()
+            family, rank = dispatch[key]
+            yield family, rank, (m.group(1), m.group(key))
+        pos = m.start() + 1
+
+
+def _unique_values(found: List[Tuple[int, tuple]]) -> List[str]:
+    """Nombres capturés, nettoyés (sans espaces, virgule → point), sans doublon, dans l'ordre.
+
+    Le filtrage ne dépend que de la valeur : dédoublonner avant revient au même.
+    Un appel par famille (kWh, m³, litres) : une même valeur peut légitimement
+    figurer sous deux unités, d'où pas d'ensemble `(unité, valeur)` partagé.
+    """
+    return list(dict.fromkeys(_clean_number(groups[0]) for _, groups in found))
+
+
+def _extract_consumption(text: str, text_lower: str, has_arabic: bool) -> List[DonneeEnvironnementale]:
     """Extrait les données de consommation d'énergie."""
     donnees: List[DonneeEnvironnementale] = []
 
+    faithful = _lower_is_faithful(text, text_lower)
+    subject = text.lower() if faithful else text
+    num_rx, num_rx_ci, num_dispatch, context_scans = _CONSUMPTION_SCANS[has_arabic]
+
+    # Matches par famille, dans l'ordre des patterns puis du texte
+    hits: Dict[str, List[Tuple[int, tuple]]] = {family: [] for family, _ in _CONSUMPTION_FAMILIES}
+    for family, rank, groups in _iter_num_units(num_rx if faithful else num_rx_ci, num_dispatch, subject):
+        hits[family].append((rank, groups))
+    for family, rx, rx_ci, dispatch in context_scans:
+        hits[family].extend(_iter_by_pattern(rx if faithful else rx_ci, dispatch, subject))
+    for found in hits.values():
+        found.sort(key=lambda hit: hit[0])
+
     # ── kWh (électricité / gaz) ──
-    kwh_patterns = [
-        r'([\d\s.,]+)\s*(kwh)',
-        r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(kwh)',
-        r'\u00e9nergie[:\s]*(?:consomm\u00e9e)?[:\s]*([\d\s.,]+)\s*(kwh)',
-        r'energie[:\s]*(?:consommee)?[:\s]*([\d\s.,]+)\s*(kwh)',
-        r'total[:\s]*([\d\s.,]+)\s*(kwh)',
-        # STEG : "Quantit\u00e9 (1)  400" -> only capture 1 standalone integer
-        r'quantit[\u00e9e]\s*(?:\(\d\))?\s+(\d+)',
-        # Arabe : استهلاك ... كو.س  / طاقة ... كو.س
-        r'\u0627\u0633\u062a\u0647\u0644\u0627\u0643[:\s]*([\d\s.,]+)\s*(kwh|\u0643\.?\u0648\.?\u0633|\u0643\u064a\u0644\u0648\u0648\u0627\u0637)',
-        r'\u0637\u0627\u0642\u0629[:\s]*([\d\s.,]+)\s*(kwh|\u0643\.?\u0648\.?\u0633)',
-        r'([\d\s.,]+)\s*(\u0643\.?\u0648\.?\u0633|\u0643\u064a\u0644\u0648\u0648\u0627\u0637)',
-    ]
-    seen_kwh = set()
-    for pat in kwh_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                fv = float(val)
-                # Filtrer les valeurs absurdes (r\u00e9sidentiel : 1 - 100 000 kWh)
-                if fv < 1 or fv > 100000:
-                    continue
-            except ValueError:
-                continue
-            if val not in seen_kwh:
-                seen_kwh.add(val)
-                donnees.append(DonneeEnvironnementale(
-                    champ="Énergie consommée",
-                    valeur=val, unite="kWh", confiance=0.85
-                ))
+    for val in _unique_values(hits["kwh"]):
+        fv = _parse_number(val)
+        # Filtrer les valeurs absurdes (r\u00e9sidentiel : 1 - 100 000 kWh)
+        if fv is None or fv < 1 or fv > 100000:
+            continue
+        donnees.append(DonneeEnvironnementale(
+            champ="Énergie consommée",
+            valeur=val, unite="kWh", confiance=0.85
+        ))
 
     # ── m³ (gaz / eau) ──
-    m3_patterns = [
-        r'([\d\s.,]+)\s*(m[\u00b33]|m\s*cube)',
-        r'consommation[:\s]*(?:de\s+)?([\d\s.,]+)\s*(m[\u00b33])',
-        r'volume[:\s]*([\d\s.,]+)\s*(m[\u00b33])',
-        # Arabe : متر مكعب / م³
-        r'([\d\s.,]+)\s*(\u0645\u062a\u0631\s*\u0645\u0643\u0639\u0628|\u0645[\u00b33])',
-        r'\u0627\u0633\u062a\u0647\u0644\u0627\u0643[:\s]*([\d\s.,]+)\s*(\u0645[\u00b33]|m[\u00b33])',
-    ]
-    seen_m3 = set()
-    for pat in m3_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                float(val)
-            except ValueError:
-                continue
-            if val not in seen_m3:
-                seen_m3.add(val)
-                label = "Volume consommé (eau)" if "eau" in text_lower or "sonede" in text_lower else "Volume consommé (gaz)"
-                donnees.append(DonneeEnvironnementale(
-                    champ=label, valeur=val, unite="m³", confiance=0.80
-                ))
+    has_m3 = False
+    label = "Volume consommé (eau)" if "eau" in text_lower or "sonede" in text_lower else "Volume consommé (gaz)"
+    for val in _unique_values(hits["m3"]):
+        if _parse_number(val) is None:
+            continue
+        has_m3 = True
+        donnees.append(DonneeEnvironnementale(
+            champ=label, valeur=val, unite="m³", confiance=0.80
+        ))
 
     # ── STEG gaz : extraction contextuelle m³ ──
     # Les factures STEG combinent électricité et gaz dans un tableau.
     # La quantité gaz (m³) apparaît dans la section Gaz sans unité explicite.
-    if 'gaz' in text_lower and not seen_m3:
+    # La section commence par « total electricit… » ou « مجموع الكهرباء » : sans
+    # l'un de ces littéraux (minuscules fidèles), inutile de lancer la regex DOTALL
+    if 'gaz' in text_lower and not has_m3 and (
+        not faithful or "electricit" in text_lower or "\u0645\u062c\u0645\u0648\u0639" in text_lower
+    ):
         # Chercher entre "Total Electricité" et "Total Gaz"
-        gaz_section = re.search(
-            r'(?:total\s*electricit[\u00e9e]|\u0645\u062c\u0645\u0648\u0639\s*\u0627\u0644\u0643\u0647\u0631\u0628\u0627\u0621)(.*?)(?:total\s*gaz|\u0645\u062c\u0645\u0648\u0639\s*\u0627\u0644\u063a\u0627\u0632)',
-            text, re.IGNORECASE | re.DOTALL
-        )
+        gaz_section = _GAZ_SECTION_RE.search(text)
         if gaz_section:
             gaz_text = gaz_section.group(1)
             # Chercher des entiers PURS (pas partie d'un décimal)
             # (?<!\.) exclut les digits après un point (ex: 85 de 85.624)
             # (?!\.\d) exclut les digits suivis d'un point-décimal
-            candidates = re.findall(r'(?<![.\d])(\d{2,5})(?!\.\d)', gaz_text)
+            candidates = _GAZ_INT_RE.findall(gaz_text)
             for c in candidates:
                 cv = int(c)
                 # Min 50 (exclut TVA 13/19, nb mois, puissance)
                 # Max 50000, exclure années 2000-2100
+                # (seule la 1re retenue est ajoutée : pas de doublon possible)
                 if 50 <= cv <= 50000 and not (2000 <= cv <= 2100):
-                    if str(cv) not in seen_m3:
-                        seen_m3.add(str(cv))
-                        donnees.append(DonneeEnvironnementale(
-                            champ="Volume consommé (gaz)", valeur=str(cv),
-                            unite="m³", confiance=0.70
-                        ))
-                        break
+                    donnees.append(DonneeEnvironnementale(
+                        champ="Volume consommé (gaz)", valeur=str(cv),
+                        unite="m³", confiance=0.70
+                    ))
+                    break
 
     # ── Litres (carburant) ──
-    litre_patterns = [
-        r'([\d\s.,]+)\s*(litres?|l\b)',
-        r'quantit[\u00e9e][:\s]*([\d\s.,]+)\s*(litres?|l\b)',
-        r'volume[:\s]*([\d\s.,]+)\s*(litres?|l\b)',
-        # Arabe : لتر
-        r'([\d\s.,]+)\s*(\u0644\u062a\u0631)',
-        r'\u0643\u0645\u064a\u0629[:\s]*([\d\s.,]+)\s*(\u0644\u062a\u0631|litres?)',
-    ]
-    seen_l = set()
-    for pat in litre_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            try:
-                fv = float(val)
-                if fv < 0.1 or fv > 100000:
-                    continue
-            except ValueError:
-                continue
-            if val not in seen_l:
-                seen_l.add(val)
-                donnees.append(DonneeEnvironnementale(
-                    champ="Volume carburant", valeur=val, unite="litres", confiance=0.75
-                ))
+    for val in _unique_values(hits["litre"]):
+        fv = _parse_number(val)
+        if fv is None or fv < 0.1 or fv > 100000:
+            continue
+        donnees.append(DonneeEnvironnementale(
+            champ="Volume carburant", valeur=val, unite="litres", confiance=0.75
+        ))
 
     return donnees
 
 
-def _extract_period(text: str) -> Optional[str]:
+# ── Périodes de facturation ──
+# Le 1er pattern (dans cet ordre) qui matche quelque part l'emporte
+_PERIOD_PATTERNS = [
+    # "du 01/01/2025 au 31/01/2025"
+    r'(?:du|from|p\u00e9riode|periode)\s*[:\s]?\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:au|to|[-\u2013])\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
+    # Arabe : من ... إلى ...  (min ... ila ...)
+    r'\u0645\u0646\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:\u0625\u0644\u0649|\u0627\u0644\u0649)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
+    # STEG : format ISO "YYYY-MM-DD : \u00e0/\u0625\u0644\u0649 YYYY-MM-DD" ou "YYYY-MM-DD ... YYYY-MM-DD"
+    r'(\d{4}-\d{2}-\d{2})\s*[:\s]*(?:\u0625\u0644[\u064a\u0649]|\u00e0|au|to)?\s*[:\s]*(\d{4}-\d{2}-\d{2})',
+    # "Janvier 2025" / "January 2025" / mois arabes
+    r'((?:janvier|f\u00e9vrier|mars|avril|mai|juin|juillet|ao\u00fbt|septembre|octobre|novembre|d\u00e9cembre|january|february|march|april|may|june|july|august|september|october|november|december|\u062c\u0627\u0646\u0641\u064a|\u0641\u064a\u0641\u0631\u064a|\u0645\u0627\u0631\u0633|\u0623\u0641\u0631\u064a\u0644|\u0645\u0627\u064a|\u062c\u0648\u0627\u0646|\u062c\u0648\u064a\u0644\u064a\u0629|\u0623\u0648\u062a|\u0633\u0628\u062a\u0645\u0628\u0631|\u0623\u0643\u062a\u0648\u0628\u0631|\u0646\u0648\u0641\u0645\u0628\u0631|\u062f\u064a\u0633\u0645\u0628\u0631)\s+\d{4})',
+    # "01/2025 - 02/2025"
+    r'(\d{1,2}[/\-]\d{4})\s*[-\u2013\u00e0]\s*(\d{1,2}[/\-]\d{4})',
+    # Trimestre
+    r'((?:T[1-4]|Q[1-4]|trimestre\s*\d)\s*\d{4})',
+]
+# Une seule alternance ; clé : le texte contient-il de l'arabe ?
+_PERIOD_SCANS = {
+    with_arabic: _fuse_patterns(
+        [p for p in _PERIOD_PATTERNS if with_arabic or not _starts_arabic(p)], re.IGNORECASE
+    )
+    for with_arabic in (True, False)
+}
+
+
+def _extract_period(text: str, has_arabic: bool) -> Optional[str]:
     """Extrait la période de facturation."""
-    period_patterns = [
-        # "du 01/01/2025 au 31/01/2025"
-        r'(?:du|from|p\u00e9riode|periode)\s*[:\s]?\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:au|to|[-\u2013])\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
-        # Arabe : من ... إلى ...  (min ... ila ...)
-        r'(?:\u0645\u0646)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})\s*(?:\u0625\u0644\u0649|\u0627\u0644\u0649)\s*(\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4})',
-        # STEG : format ISO "YYYY-MM-DD : \u00e0/\u0625\u0644\u0649 YYYY-MM-DD" ou "YYYY-MM-DD ... YYYY-MM-DD"
-        r'(\d{4}-\d{2}-\d{2})\s*[:\s]*(?:\u0625\u0644[\u064a\u0649]|\u00e0|au|to)?\s*[:\s]*(\d{4}-\d{2}-\d{2})',
-        # "Janvier 2025" / "January 2025" / mois arabes
-        r'((?:janvier|f\u00e9vrier|mars|avril|mai|juin|juillet|ao\u00fbt|septembre|octobre|novembre|d\u00e9cembre|january|february|march|april|may|june|july|august|september|october|november|december|\u062c\u0627\u0646\u0641\u064a|\u0641\u064a\u0641\u0631\u064a|\u0645\u0627\u0631\u0633|\u0623\u0641\u0631\u064a\u0644|\u0645\u0627\u064a|\u062c\u0648\u0627\u0646|\u062c\u0648\u064a\u0644\u064a\u0629|\u0623\u0648\u062a|\u0633\u0628\u062a\u0645\u0628\u0631|\u0623\u0643\u062a\u0648\u0628\u0631|\u0646\u0648\u0641\u0645\u0628\u0631|\u062f\u064a\u0633\u0645\u0628\u0631)\s+\d{4})',
-        # "01/2025 - 02/2025"
-        r'(\d{1,2}[/\-]\d{4})\s*[-\u2013\u00e0]\s*(\d{1,2}[/\-]\d{4})',
-        # Trimestre
-        r'((?:T[1-4]|Q[1-4]|trimestre\s*\d)\s*\d{4})',
-    ]
-    for pat in period_patterns:
-        match = re.search(pat, text, re.IGNORECASE)
-        if match:
-            groups = [g for g in match.groups() if g]
-            if len(groups) > 1:
-                # Trier chronologiquement (corrige l'inversion RTL arabe)
-                sorted_dates = sorted(groups[:2])
-                return f"{sorted_dates[0]} au {sorted_dates[1]}"
-            return groups[0]
+    found = _first_by_pattern(*_PERIOD_SCANS[has_arabic], text)
+    if found:
+        groups = [g for g in found[1] if g]
+        if len(groups) > 1:
+            # Trier chronologiquement (corrige l'inversion RTL arabe)
+            sorted_dates = sorted(groups[:2])
+            return f"{sorted_dates[0]} au {sorted_dates[1]}"
+        return groups[0]
     return None
 
 
-def _extract_amounts(text: str) -> List[DonneeEnvironnementale]:
+# ── Montants ──
+_AMOUNT_PATTERNS = [
+    # STEG : "595.000  Montant \u00e0 payer" (montant AVANT le libell\u00e9)
+    r'(\d[\d.,]+)\s+montant\s*(?:\u00e0|a)\s*payer',
+    # STEG : "Montant \u00e0 payer  595.000"
+    r'montant\s*(?:\u00e0|a)\s*payer[:\s]*(\d[\d\s.,]*)',
+    # STEG : "MONTANT TOTAL  139.006"
+    r'montant\s*total[:\s]*(\d[\d\s.,]*)',
+    # STEG : "595.000  Montant" (bulletin de versement)
+    r'(\d[\d.,]+)\s+montant\b',
+    # "Total TTC: 125,50 DT" ou "Total: 125.50 \u20ac"
+    r'total\s*(?:ttc|ht)?[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?|\$|usd)',
+    # "Montant: 125,50 DT"
+    r'montant[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?|\$|usd)',
+    # "Net \u00e0 payer: 125,50 DT"
+    r'net\s*(?:\u00e0|a)\s*payer[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?)',
+    # Montant avec devise avant le nombre
+    r'(dt|tnd|\u20ac)\s*([\d\s.,]+)',
+    # Arabe : المبلغ / المجموع / الصافي
+    r'\u0627\u0644\u0645\u0628\u0644\u063a[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
+    r'\u0627\u0644\u0645\u062c\u0645\u0648\u0639[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
+    r'\u0627\u0644\u0635\u0627\u0641\u064a[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
+]
+
+# Devise capturée (en minuscules) → code
+_CURRENCY_MAP: Dict[str, str] = {
+    **dict.fromkeys(("\u20ac", "eur", "euros", "euro"), "EUR"),
+    **dict.fromkeys(("$", "usd"), "USD"),
+    **dict.fromkeys(("dt", "tnd", "dinar", "dinars",
+                     "\u062f.\u062a", "\u062f\u062a",  # د.ت / دت
+                     "\u062f\u064a\u0646\u0627\u0631"), "DT"),  # دينار
+}
+
+
+def _build_amount_scan(with_arabic: bool):
+    """(regex, regex _CI, dispatch) des montants ; sans `with_arabic`, sans les libellés arabes."""
+    patterns = [p for p in _AMOUNT_PATTERNS if with_arabic or not _starts_arabic(p)]
+    rx, dispatch = _fuse_patterns(patterns)
+    return rx, _fuse_patterns(patterns, re.IGNORECASE)[0], dispatch
+
+
+# Clé : le texte contient-il de l'arabe ?
+_AMOUNT_SCANS = {with_arabic: _build_amount_scan(with_arabic) for with_arabic in (True, False)}
+
+
+def _extract_amounts(text: str, text_lower: str, has_arabic: bool) -> List[DonneeEnvironnementale]:
     """Extrait les montants monétaires liés à l'énergie."""
     donnees: List[DonneeEnvironnementale] = []
 
-    amount_patterns = [
-        # STEG : "595.000  Montant \u00e0 payer" (montant AVANT le libell\u00e9)
-        r'(\d[\d.,]+)\s+montant\s*(?:\u00e0|a)\s*payer',
-        # STEG : "Montant \u00e0 payer  595.000"
-        r'montant\s*(?:\u00e0|a)\s*payer[:\s]*(\d[\d\s.,]*)',
-        # STEG : "MONTANT TOTAL  139.006"
-        r'montant\s*total[:\s]*(\d[\d\s.,]*)',
-        # STEG : "595.000  Montant" (bulletin de versement)
-        r'(\d[\d.,]+)\s+montant\b',
-        # "Total TTC: 125,50 DT" ou "Total: 125.50 \u20ac"
-        r'total\s*(?:ttc|ht)?[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?|\$|usd)',
-        # "Montant: 125,50 DT"
-        r'montant[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?|\$|usd)',
-        # "Net \u00e0 payer: 125,50 DT"
-        r'net\s*(?:\u00e0|a)\s*payer[:\s]*([\d\s.,]+)\s*(dt|tnd|\u20ac|eur|dinars?|euros?)',
-        # Montant avec devise avant le nombre
-        r'(dt|tnd|\u20ac)\s*([\d\s.,]+)',
-        # Arabe : المبلغ / المجموع / الصافي
-        r'\u0627\u0644\u0645\u0628\u0644\u063a[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
-        r'\u0627\u0644\u0645\u062c\u0645\u0648\u0639[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
-        r'\u0627\u0644\u0635\u0627\u0641\u064a[:\s]*([\d\s.,]+)\s*(\u062f\.?\u062a|dt|tnd|\u062f\u064a\u0646\u0627\u0631)',
-    ]
+    rx, rx_ci, dispatch = _AMOUNT_SCANS[has_arabic]
+    if _lower_is_faithful(text, text_lower):
+        subject = text.lower()
+    else:
+        rx, subject = rx_ci, text
     seen = set()
-    for pat in amount_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            groups = match.groups()
-            val = groups[0].replace(" ", "").replace(",", ".")
-            try:
-                float(val)
-            except ValueError:
-                # Peut-être la devise est en premier
-                if len(groups) > 1:
-                    val = groups[1].replace(" ", "").replace(",", ".")
-                    try:
-                        float(val)
-                    except ValueError:
-                        continue
-                else:
+    for _, groups in _iter_by_pattern(rx, dispatch, subject):
+        val = _clean_number(groups[0])
+        if _parse_number(val) is None:
+            # Peut-être la devise est en premier
+            if len(groups) < 2:
+                continue
+            val = _clean_number(groups[1])
+            if _parse_number(val) is None:
+                continue
+        if val not in seen:
+            seen.add(val)
+            # Un pattern capture au plus une devise : la première trouvée suffit.
+            # Les devises sont des littéraux sans espaces : pas de .strip()
+            devise = "DT"
+            for g in groups:
+                if g is None:
                     continue
-            if val not in seen:
-                seen.add(val)
-                devise = "DT"
-                for g in groups:
-                    gl = g.lower().strip()
-                    if gl in ("\u20ac", "eur", "euros", "euro"):
-                        devise = "EUR"
-                    elif gl in ("$", "usd"):
-                        devise = "USD"
-                    elif gl in ("dt", "tnd", "dinar", "dinars",
-                                "\u062f.\u062a", "\u062f\u062a",  # د.ت / دت
-                                "\u062f\u064a\u0646\u0627\u0631"):  # دينار
-                        devise = "DT"
-                donnees.append(DonneeEnvironnementale(
-                    champ="Montant facture", valeur=val, unite=devise, confiance=0.70
-                ))
+                code = _CURRENCY_MAP.get(g.lower())
+                if code is not None:
+                    devise = code
+                    break
+            donnees.append(DonneeEnvironnementale(
+                champ="Montant facture", valeur=val, unite=devise, confiance=0.70
+            ))
     return donnees
 
 
-def _extract_co2_direct(text: str) -> List[DonneeEnvironnementale]:
+# ── CO₂ déclaré ──
+# Nombres atomiques : aucune unité ne commence par [\d\s.,] (matches inchangés)
+_CO2_PATTERNS = [_portable_atomic(p) for p in [
+    r'(?:co2|co₂|carbone|émissions?|emissions?)[:\s]*((?>[\d\s.,]+))\s*(kg|tonnes?|t\b|g\b)',
+    r'((?>[\d\s.,]+))\s*(kg|tonnes?|t)\s*(?:de\s+)?(?:co2|co₂|carbone)',
+    r'empreinte\s*carbone[:\s]*((?>[\d\s.,]+))\s*(kg|tonnes?|t)',
+]]
+# Chaque pattern contient l'un de ces mots : sans eux, aucun match possible
+_CO2_KEYWORDS = ("co2", "co₂", "carbone", "mission")
+_CO2_RE, _CO2_DISPATCH = _fuse_patterns(_CO2_PATTERNS)
+_CO2_RE_CI, _ = _fuse_patterns(_CO2_PATTERNS, re.IGNORECASE)
+
+
+def _extract_co2_direct(text: str, text_lower: str) -> List[DonneeEnvironnementale]:
     """Extrait les émissions CO₂ directement mentionnées dans la facture."""
     donnees: List[DonneeEnvironnementale] = []
-    co2_patterns = [
-        r'(?:co2|co₂|carbone|émissions?|emissions?)[:\s]*([\d\s.,]+)\s*(kg|tonnes?|t\b|g\b)',
-        r'([\d\s.,]+)\s*(kg|tonnes?|t)\s*(?:de\s+)?(?:co2|co₂|carbone)',
-        r'empreinte\s*carbone[:\s]*([\d\s.,]+)\s*(kg|tonnes?|t)',
-    ]
-    for pat in co2_patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            val = match.group(1).replace(" ", "").replace(",", ".")
-            unite = match.group(2).lower()
-            if unite in ("t", "tonnes", "tonne"):
-                unite = "tonnes CO₂"
-            else:
-                unite = "kg CO₂"
-            try:
-                float(val)
-            except ValueError:
-                continue
-            donnees.append(DonneeEnvironnementale(
-                champ="Émissions CO₂ (déclarées)", valeur=val, unite=unite, confiance=0.90
-            ))
+    if _lower_is_faithful(text, text_lower):
+        # La plupart des factures ne déclarent aucun CO₂ : on évite le scan
+        # (le 2e pattern tente un match à chaque chiffre du texte)
+        if not any(kw in text_lower for kw in _CO2_KEYWORDS):
+            return donnees
+        rx, subject = _CO2_RE, text.lower()
+    else:
+        rx, subject = _CO2_RE_CI, text
+    for _, groups in _iter_by_pattern(rx, _CO2_DISPATCH, subject):
+        val = _clean_number(groups[0])
+        unite = groups[1].lower()
+        if unite in ("t", "tonnes", "tonne"):
+            unite = "tonnes CO₂"
+        else:
+            unite = "kg CO₂"
+        if _parse_number(val) is None:
+            continue
+        donnees.append(DonneeEnvironnementale(
+            champ="Émissions CO₂ (déclarées)", valeur=val, unite=unite, confiance=0.90
+        ))
     return donnees
 
 
@@ -507,16 +794,17 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
         return ResultatExtraction(resume="Aucun texte à analyser.")
 
     text_lower = _normalize(texte_ocr)
+    has_arabic = _ARABIC_RE.search(text_lower) is not None
     result = ResultatExtraction()
 
     # 1. Identifier le type de facture
-    result.type_facture = _detect_type(text_lower)
+    result.type_facture = _detect_type(text_lower, has_arabic)
 
     # 2. Identifier le fournisseur
-    result.fournisseur = _detect_fournisseur(text_lower)
+    result.fournisseur = _detect_fournisseur(text_lower, has_arabic)
 
     # 3. Extraire la période
-    result.periode = _extract_period(texte_ocr)
+    result.periode = _extract_period(texte_ocr, has_arabic)
 
     # 4. Extraire le type d'énergie
     energy_type = _extract_energy_type(text_lower, result.type_facture)
@@ -526,13 +814,13 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
         ))
 
     # 5. Extraire les consommations
-    result.donnees.extend(_extract_consumption(texte_ocr, text_lower))
+    result.donnees.extend(_extract_consumption(texte_ocr, text_lower, has_arabic))
 
     # 6. Extraire les montants
-    result.donnees.extend(_extract_amounts(texte_ocr))
+    result.donnees.extend(_extract_amounts(texte_ocr, text_lower, has_arabic))
 
     # 7. Extraire les émissions CO₂ déclarées
-    result.donnees.extend(_extract_co2_direct(texte_ocr))
+    result.donnees.extend(_extract_co2_direct(texte_ocr, text_lower))
 
     # 8. Calculer les émissions CO₂ si non déclarées
     has_declared_co2 = any("CO₂" in d.champ for d in result.donnees)
@@ -557,6 +845,19 @@ def extraire_donnees_environnementales(texte_ocr: str) -> ResultatExtraction:
     return result
 
 
+def batch_extraire(textes: List[str], workers: Optional[int] = None) -> List[ResultatExtraction]:
+    """Analyse plusieurs textes OCR en parallèle (un processus par cœur par défaut).
+
+    Les résultats sont rendus dans l'ordre des textes.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(textes) < 2:
+        return [extraire_donnees_environnementales(t) for t in textes]
+    chunksize = max(1, len(textes) // workers // 4)
+    with ProcessPoolExecutor(workers) as ex:
+        return list(ex.map(extraire_donnees_environnementales, textes, chunksize=chunksize))
+
+
 def _generer_resume(r: ResultatExtraction) -> str:
     """Génère un résumé lisible des données extraites."""
     lines = []
@@ -1,8 +1,22 @@
 import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib.metadata
+import importlib.util
 import json
+import multiprocessing
 import os
+import platform
+import queue
+import re
+import shutil
 import sys
-from typing import List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Forcer UTF-8 sur stdout/stderr (Windows CP1252 ne gère pas les caractères spéciaux)
 if hasattr(sys.stdout, "reconfigure"):
@@ -13,13 +27,24 @@ if hasattr(sys.stderr, "reconfigure"):
 import cv2
 import numpy as np
 
+# PaddleOCR (et Paddle, plusieurs centaines de Mo) n'est importé qu'au choix du moteur :
+# voir _paddle_is_usable / _new_paddle_ocr
+
+# Empreintes du cache OCR : BLAKE3 ou xxh3 (SIMD) si installés, sinon blake2b
 try:
-    from paddleocr import PaddleOCR
+    import blake3
 except Exception:
-    PaddleOCR = None  # type: ignore[assignment]
+    blake3 = None  # type: ignore[assignment]
+try:
+    import xxhash
+except Exception:
+    xxhash = None  # type: ignore[assignment]
 
 from extractor import extraire_donnees_environnementales
 
+# Scripts arabes (base, supplément, étendu-A) : lignes à garder de la passe AR
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+
 # Extensions d'images supportées par OpenCV
 _SUPPORTED_IMAGE_EXTS = {
     ".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff",
@@ -27,15 +52,18 @@ _SUPPORTED_IMAGE_EXTS = {
 }
 # Extensions supplémentaires supportées (PDF)
 _SUPPORTED_EXTS = _SUPPORTED_IMAGE_EXTS | {".pdf"}
+# Liste affichée dans le message d'erreur (triée une fois)
+_SUPPORTED_EXTS_SORTED = ", ".join(sorted(_SUPPORTED_EXTS))
 
 
-def _is_pdf(path: str) -> bool:
-    return os.path.splitext(path)[1].lower() == ".pdf"
-
-
-def _is_supported(path: str) -> bool:
+def _classify(path: str) -> Tuple[str, Optional[str]]:
+    """(extension, "pdf" | "img" | None) en un seul appel à splitext."""
     ext = os.path.splitext(path)[1].lower()
-    return ext in _SUPPORTED_EXTS
+    if ext == ".pdf":
+        return ext, "pdf"
+    if ext in _SUPPORTED_IMAGE_EXTS:
+        return ext, "img"
+    return ext, None
 
 
 def _make_output_path(input_path: str, suffix: str = "_ocr.txt") -> str:
@@ -44,7 +72,7 @@ def _make_output_path(input_path: str, suffix: str = "_ocr.txt") -> str:
     return base + suffix
 
 
-def _load_images_from_pdf(pdf_path: str, max_pages: Optional[int]) -> List[np.ndarray]:
+def _open_pdf(pdf_path: str):
     try:
         import fitz  # PyMuPDF
     except Exception as exc:  # pragma: no cover
@@ -53,91 +81,359 @@ def _load_images_from_pdf(pdf_path: str, max_pages: Optional[int]) -> List[np.nd
             "Installez-le avec: pip install pymupdf\n"
             f"Détail: {exc}"
         )
+    return fitz.open(pdf_path)
+
+
+def _page_text_layer(page) -> str:
+    """Texte embarqué de la page (PDF numérique), bloc par bloc dans l'ordre de lecture."""
+    blocks = page.get_text("blocks", sort=True)
+    # (x0, y0, x1, y1, texte, n° de bloc, type) ; type 0 = texte, 1 = image
+    return "\n".join([
+        line for *_, raw, _, kind in blocks if kind == 0 and (line := raw.strip())
+    ])
+
+
+# Densité minimale du texte embarqué (caractères par pt²) pour se passer de l'OCR :
+# ~50 caractères sur une page A4. En deçà (tampon, numéro de page sur un scan…),
+# la page est rendue et reconnue.
+_TEXT_LAYER_MIN_DENSITY = 1e-4
+
+
+def _load_page(doc, index: int, use_text_layer: bool = True) -> Union[np.ndarray, str]:
+    """Texte embarqué de la page s'il est assez dense (ni rendu ni OCR), sinon la page rendue."""
+    page = doc.load_page(index)
+    if use_text_layer:
+        text = _page_text_layer(page)
+        area = page.rect.width * page.rect.height
+        if text and len(text) >= _TEXT_LAYER_MIN_DENSITY * area:
+            return text
+    return _render_page(page)
+
+
+def _render_page(page) -> np.ndarray:
+    """Rend une page en RGB (~300 DPI)."""
+    import fitz  # PyMuPDF
+
+    # Zoom élevé pour améliorer l'OCR (~300 DPI), davantage pour les petites pages :
+    # le côté le plus long atteint 1200 px dès le rendu, sans agrandissement en aval
+    zoom = max(3.0, 1200 / max(page.rect.width, page.rect.height, 1))
+    # PyMuPDF n'a pas d'espace BGR : rendu RGB, le pré-traitement convertit (drapeau `rgb`)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+    # Une seule copie : `pix.samples` (bytes) ; np.frombuffer n'en refait pas. `samples_mv`
+    # éviterait cette copie mais pointe dans la pixmap, libérée au retour : la page
+    # devrait alors être recopiée de toute façon (elle est traitée dans un autre thread)
+    img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+    elif pix.n != 3:
+        # Cas rare, on garde les 3 premiers canaux
+        img = np.ascontiguousarray(img[:, :, :3])
+    # `pix.samples` est une copie des pixels : pixmap et page peuvent partir
+    return img
+
+
+def _iter_images_from_pdf(
+    doc, pages_to_read: int, use_text_layer: bool = True
+) -> Iterator[Union[np.ndarray, str]]:
+    """Rend les pages une à une (le rendu suivant n'a lieu qu'à la demande).
+
+    Une page qui porte déjà du texte (PDF numérique) est donnée en `str`, sans rendu.
+    Seule la page courante est gardée ici ; le document est fermé à la fin.
+    Pas de passage en BGR : le pré-traitement convertit directement depuis le RGB.
+    """
+    import fitz  # PyMuPDF
 
-    doc = fitz.open(pdf_path)
-    images: List[np.ndarray] = []
-    page_count = len(doc)
-    if page_count == 0:
-        return images
-
-    pages_to_read = page_count
-    if max_pages is not None:
-        pages_to_read = min(pages_to_read, max_pages)
-
-    # Zoom élevé pour améliorer l'OCR (~300 DPI)
-    mat = fitz.Matrix(3, 3)
-    for i in range(pages_to_read):
-        page = doc.load_page(i)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
-        if pix.n == 1:
-            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-        elif pix.n == 3:
-            # pixmap est en RGB; OpenCV attend BGR
-            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        else:
-            # Cas rare, on force vers BGR
-            img = img[:, :, :3]
-            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        images.append(img)
-    return images
-
-
-def _load_images(input_path: str, max_pages: Optional[int]) -> List[np.ndarray]:
+    try:
+        for i in range(pages_to_read):
+            # Aucune référence gardée ici : la page part dès que l'aval l'a traitée
+            yield _load_page(doc, i, use_text_layer)
+            # Vider le cache global de MuPDF (polices, images décodées…)
+            fitz.TOOLS.store_shrink(100)
+    finally:
+        doc.close()
+
+
+# Document PyMuPDF propre à chaque processus de rendu (un `Document` n'est pas picklable)
+_WORKER_DOC = None
+_WORKER_USE_TEXT_LAYER = True
+
+
+def _init_render_worker(pdf_path: str, use_text_layer: bool = True) -> None:
+    global _WORKER_DOC, _WORKER_USE_TEXT_LAYER
+    _WORKER_DOC = _open_pdf(pdf_path)
+    _WORKER_USE_TEXT_LAYER = use_text_layer
+
+
+def _render_worker_pages(indices: List[int]) -> List[Union[np.ndarray, str]]:
+    """Tâche d'un processus de rendu : pages demandées (texte embarqué ou image)."""
+    import fitz  # PyMuPDF
+
+    pages = [_load_page(_WORKER_DOC, i, _WORKER_USE_TEXT_LAYER) for i in indices]
+    fitz.TOOLS.store_shrink(100)
+    return pages
+
+
+def _iter_images_from_pdf_parallel(
+    pdf_path: str, pages_to_read: int, workers: int, use_text_layer: bool = True
+) -> Iterator[Union[np.ndarray, str]]:
+    """Comme `_iter_images_from_pdf`, le rendu étant réparti sur `workers` processus.
+
+    PyMuPDF garde le GIL pendant le rendu : des threads ne rendraient pas en parallèle.
+    Pages rendues dans l'ordre, au plus 2 par processus en avance.
+    """
+    # "spawn" : le rendu démarre alors que les threads du pipeline tournent déjà
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_render_worker,
+        initargs=(pdf_path, use_text_layer),
+    ) as pool:
+        batches = ([i] for i in range(pages_to_read))
+        for _, pages in _iter_pool_results(pool, _render_worker_pages, batches, 2 * workers):
+            yield from pages
+
+
+def _open_images(
+    input_path: str, max_pages: Optional[int], render_workers: int = 1, use_text_layer: bool = True
+) -> Tuple[int, Iterator[Union[np.ndarray, str]], bool]:
+    """Valide l'entrée et renvoie (nombre de pages, itérateur des pages, pages en RGB ?).
+
+    Les pages PDF sont en RGB, les images lues par OpenCV en BGR ;
+    une page PDF qui porte déjà du texte est donnée directement en `str` (sauf `use_text_layer=False`).
+    Les erreurs d'entrée sont levées ici ; le rendu des pages PDF est différé.
+    """
     if not os.path.exists(input_path):
         raise SystemExit(f"Erreur: fichier introuvable: {input_path}")
 
-    if not _is_supported(input_path):
-        ext = os.path.splitext(input_path)[1].lower()
-        supported = ", ".join(sorted(_SUPPORTED_EXTS))
+    ext, kind = _classify(input_path)
+    if kind is None:
         raise SystemExit(
             f"Erreur: extension '{ext}' non supportée.\n"
-            f"Extensions supportées: {supported}"
+            f"Extensions supportées: {_SUPPORTED_EXTS_SORTED}"
         )
 
-    if _is_pdf(input_path):
-        images = _load_images_from_pdf(input_path, max_pages=max_pages)
-        if not images:
+    if kind == "pdf":
+        doc = _open_pdf(input_path)
+        pages_to_read = len(doc)
+        if max_pages is not None:
+            pages_to_read = min(pages_to_read, max_pages)
+        if pages_to_read <= 0:
             raise SystemExit("Erreur: PDF vide ou pages non lisibles.")
-        return images
-
-    image = cv2.imread(input_path)
+        render_workers = min(render_workers, pages_to_read)
+        if render_workers > 1:
+            doc.close()
+            return pages_to_read, _iter_images_from_pdf_parallel(
+                input_path, pages_to_read, render_workers, use_text_layer
+            ), True
+        return pages_to_read, _iter_images_from_pdf(doc, pages_to_read, use_text_layer), True
+
+    # imdecode sur les octets du fichier : chemins non ASCII sous Windows
+    try:
+        data = np.fromfile(os.fspath(input_path), dtype=np.uint8)
+    except OSError:
+        data = None
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR) if data is not None and data.size else None
     if image is None:
         raise SystemExit("Erreur: image non lisible (format non supporté ou fichier corrompu).")
-    return [image]
+    return 1, iter([image]), False
+
+
+# Profondeur des files entre étapes (rendu → pré-traitement → OCR)
+_PIPELINE_DEPTH = 4
+
+
+def _prefetch(items: Iterable, depth: int = _PIPELINE_DEPTH) -> Iterator:
+    """Itère `items` dans un thread producteur, à travers une file bornée.
+
+    L'étape suivante (thread appelant) avance pendant que le producteur
+    prépare les éléments suivants (OpenCV et les moteurs OCR relâchent le GIL).
+    Une exception du producteur est relevée côté consommateur.
+    """
+    buf: "queue.Queue" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in items:
+                if not _put(item):
+                    return
+        except BaseException as exc:
+            _put(exc)
+            return
+        _put(done)
+
+    worker = threading.Thread(target=_produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = buf.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Consommateur arrêté (fin, erreur OCR…) : libérer le producteur
+        stop.set()
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    """Regroupe `items` en listes de `size` éléments (la dernière peut être plus courte)."""
+    batch: list = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Threads de pré-traitement : OpenCV libère le GIL, deux pages traitées à la fois
+_PREPROCESS_THREADS = 2
+
+
+def _map_in_threads(fn, items: Iterable, workers: int) -> Iterator:
+    """`map(fn, items)` réparti sur `workers` threads, résultats dans l'ordre.
+
+    Au plus 2 éléments par thread en vol (via `_iter_pool_results`).
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(workers) as pool:
+        batches = ([item] for item in items)
+        for _, results in _iter_pool_results(pool, lambda batch: [fn(x) for x in batch], batches, 2 * workers):
+            yield from results
+
+
+# Débruitage de _preprocess_light : "auto" = filtre bilatéral si la page est bruitée,
+# "light" = filtre bilatéral, "strong" = moyennes non locales (~50× plus coûteux),
+# "none" = CLAHE seul
+_DENOISE_MODES = ("auto", "light", "strong", "none")
+
+# Mode "auto" : débruitage seulement au-delà de ce bruit estimé (niveaux de gris).
+# Une page PDF rendue est ~0 ; un scan ou une photo dépasse généralement 2.
+_NOISE_SIGMA_MIN = 2.0
+# Noyau d'Immerkær : différence de laplaciens, insensible aux bords francs du texte
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+def _estimate_noise(gray, n_pixels: int) -> float:
+    """Écart-type estimé du bruit (méthode d'Immerkær, un seul filtrage).
+
+    `n_pixels` est passé par l'appelant : un cv2.UMat n'expose pas sa taille.
+    """
+    residual = cv2.filter2D(gray, cv2.CV_32F, _NOISE_KERNEL)
+    return cv2.norm(residual, cv2.NORM_L1) * (np.pi / 2) ** 0.5 / (6.0 * n_pixels)
+
+
+def _opencl_is_usable() -> bool:
+    """Vrai si OpenCV dispose d'un périphérique OpenCL (GPU) pour son T-API."""
+    try:
+        return bool(cv2.ocl.haveOpenCL())
+    except Exception:
+        return False
+
+
+def _cuda_is_usable() -> bool:
+    """Vrai si OpenCV est compilé avec CUDA et voit au moins un GPU NVIDIA."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except Exception:
+        return False
+
+
+def _nlm_denoise(image_bgr, cuda: bool = False):
+    """Moyennes non locales (h=8, fenêtres 7/21), sur GPU NVIDIA si `cuda`."""
+    if cuda:
+        gpu = cv2.cuda_GpuMat()
+        gpu.upload(image_bgr.get() if isinstance(image_bgr, cv2.UMat) else image_bgr)
+        return cv2.cuda.fastNlMeansDenoisingColored(gpu, 8, 8, search_window=21, block_size=7).download()
+    return cv2.fastNlMeansDenoisingColored(image_bgr, None, 8, 8, 7, 21)
 
 
-def _preprocess_light(image_bgr: np.ndarray) -> np.ndarray:
-    """Pré-traitement LÉGER : garde les détails pour Windows OCR."""
+def _upscale_interpolation(scale: int) -> int:
+    """Bilinéaire pour un agrandissement ×2 (2 à 3× plus rapide), bicubique au-delà."""
+    return cv2.INTER_CUBIC if scale >= 3 else cv2.INTER_LINEAR
+
+
+# Un objet CLAHE par thread de pré-traitement, réutilisé d'une page à l'autre
+_CLAHE_LOCAL = threading.local()
+
+
+def _get_clahe():
+    clahe = getattr(_CLAHE_LOCAL, "clahe", None)
+    if clahe is None:
+        clahe = _CLAHE_LOCAL.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return clahe
+
+
+def _preprocess_light(
+    image_bgr: np.ndarray,
+    denoise: str = "auto",
+    opencl: bool = False,
+    rgb: bool = False,
+    cuda: bool = False,
+) -> np.ndarray:
+    """Pré-traitement LÉGER : garde les détails pour Windows OCR.
+
+    `opencl` : les opérations OpenCV tournent sur le GPU via cv2.UMat (T-API).
+    `cuda` : débruitage "strong" sur GPU NVIDIA (module cv2.cuda).
+    `rgb` : l'image reçue est en RGB (pages PDF) ; le résultat est toujours en BGR.
+    """
     # Si l'image est petite, on agrandit
     h, w = image_bgr.shape[:2]
+    if opencl:
+        image_bgr = cv2.UMat(image_bgr)
     if max(h, w) < 1200:
         scale = max(2, 1200 // max(h, w))
-        image_bgr = cv2.resize(
-            image_bgr, (w * scale, h * scale), interpolation=cv2.INTER_CUBIC
-        )
+        h, w = h * scale, w * scale
+        image_bgr = cv2.resize(image_bgr, (w, h), interpolation=_upscale_interpolation(scale))
 
     # Convertir en LAB pour rehausser le contraste sans altérer les couleurs
-    lab = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2LAB)
+    lab = cv2.cvtColor(image_bgr, cv2.COLOR_RGB2LAB if rgb else cv2.COLOR_BGR2LAB)
     l_chan, a_chan, b_chan = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    l_chan = clahe.apply(l_chan)
+    if denoise == "auto":
+        # Bruit mesuré avant CLAHE (qui l'amplifie) ; page propre : pas de filtre
+        denoise = "light" if _estimate_noise(l_chan, h * w) >= _NOISE_SIGMA_MIN else "none"
+    l_chan = _get_clahe().apply(l_chan)
     enhanced = cv2.merge([l_chan, a_chan, b_chan])
     enhanced_bgr = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
 
     # Léger débruitage qui préserve les bords du texte
-    denoised = cv2.fastNlMeansDenoisingColored(enhanced_bgr, None, 8, 8, 7, 21)
-    return denoised
+    if denoise == "strong":
+        denoised = _nlm_denoise(enhanced_bgr, cuda)
+        if cuda:
+            # Résultat déjà rapatrié du GPU en ndarray
+            return denoised
+    elif denoise == "light":
+        denoised = cv2.bilateralFilter(enhanced_bgr, d=5, sigmaColor=40, sigmaSpace=7)
+    else:
+        denoised = enhanced_bgr
+    return denoised.get() if opencl else denoised
 
 
-def _preprocess_heavy(image_bgr: np.ndarray) -> np.ndarray:
+def _preprocess_heavy(image_bgr: np.ndarray, opencl: bool = False, rgb: bool = False) -> np.ndarray:
     """Pré-traitement FORT : binarisation pour PaddleOCR (moteur IA)."""
-    gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+    h, w = image_bgr.shape[:2]
+    if opencl:
+        image_bgr = cv2.UMat(image_bgr)
+    gray = cv2.cvtColor(image_bgr, cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY)
 
-    h, w = gray.shape[:2]
     if max(h, w) < 1200:
         scale = max(2, 1200 // max(h, w))
-        gray = cv2.resize(gray, (w * scale, h * scale), interpolation=cv2.INTER_CUBIC)
+        gray = cv2.resize(gray, (w * scale, h * scale), interpolation=_upscale_interpolation(scale))
 
     # Débruitage
     blur = cv2.GaussianBlur(gray, (3, 3), 0)
@@ -147,31 +443,183 @@ def _preprocess_heavy(image_bgr: np.ndarray) -> np.ndarray:
         blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 15, 8
     )
 
-    # Si fond sombre, on inverse
-    if np.mean(th) < 127:
+    # Si fond sombre, on inverse. Décidé sur la page binarisée : la moyenne du gris
+    # n'est pas équivalente (le seuil adaptatif blanchit tout aplat, clair ou sombre).
+    # cv2.mean (SIMD, UMat comme ndarray) plutôt que np.mean
+    if cv2.mean(th)[0] < 127:
         th = cv2.bitwise_not(th)
 
-    return cv2.cvtColor(th, cv2.COLOR_GRAY2BGR)
+    out = cv2.cvtColor(th, cv2.COLOR_GRAY2BGR)
+    return out.get() if opencl else out
+
+
+def _preprocess_paddle(image_bgr: np.ndarray, rgb: bool = False) -> np.ndarray:
+    """Pré-traitement MINIMAL pour PaddleOCR : son détecteur (DB) gère contraste et bruit.
+
+    Pas d'agrandissement : PaddleOCR redimensionne lui-même (det_limit_side_len).
+    Seul l'ordre des canaux est ajusté : PaddleOCR attend du BGR.
+    """
+    if rgb:
+        return cv2.cvtColor(image_bgr, cv2.COLOR_RGB2BGR)
+    return image_bgr
 
 
 def _paddle_is_usable() -> bool:
-    if PaddleOCR is None:
-        return False
+    # Import différé : coûteux (0,5 à 2 s), inutile si Windows OCR est retenu
     try:
         import paddle  # noqa: F401
+        from paddleocr import PaddleOCR  # noqa: F401
     except Exception:
         return False
     return True
 
 
-def _create_paddle_ocr(lang: str):
-    if PaddleOCR is None:
+def _cpu_has_vnni() -> Optional[bool]:
+    """Vrai si le CPU a les instructions VNNI (produit scalaire INT8) ; None si inconnu."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return "avx512_vnni" in line or "avx_vnni" in line
+    except OSError:
+        pass
+    return None
+
+
+# Options facultatives : si PaddleOCR en refuse une (version, greffon absent), seul son
+# groupe est retiré ; sans option nommée dans l'erreur, les groupes sont retirés dans
+# l'ordre (quantification d'abord).
+# HPI : enable_hpi seul, le moteur (OpenVINO, ONNX Runtime, TensorRT) est choisi par
+# Paddle ; PaddleOCR 3 n'accepte pas hpi_config dans son constructeur.
+_OPTIONAL_PADDLE_OPTIONS = (
+    ("precision", "use_tensorrt", "enable_mkldnn"),
+    ("enable_hpi",),
+    ("rec_batch_num",),
+)
+# Modèles demandés explicitement : jamais remplacés en silence par le modèle par défaut
+_REQUIRED_PADDLE_OPTIONS = ("det_model_dir", "rec_model_dir")
+
+
+def _paddleocr_major() -> Optional[int]:
+    """Version majeure de PaddleOCR installée ; None si inconnue."""
+    try:
+        return int(importlib.metadata.version("paddleocr").split(".")[0])
+    except (importlib.metadata.PackageNotFoundError, ValueError):
+        return None
+
+
+def _paddle_on_gpu() -> bool:
+    try:
+        import paddle
+        return paddle.device.is_compiled_with_cuda()
+    except Exception:
+        return False
+
+
+def _paddle_options(
+    quantize: bool,
+    det_model_dir: Optional[str],
+    rec_model_dir: Optional[str],
+    hpi: bool = False,
+    batch_size: int = 1,
+) -> Dict[str, object]:
+    """Options PaddleOCR supplémentaires.
+
+    `quantize` : inférence INT8 (TensorRT sur GPU, MKL-DNN sur CPU) ; les modèles
+    INT8 (quantifiés PaddleSlim) se passent via det/rec_model_dir. PaddleOCR 2.x
+    seulement : PaddleOCR 3 refuse precision="int8" (SystemExit).
+    `hpi` : inférence haute performance (OpenVINO, ONNX Runtime, TensorRT : choix de Paddle).
+    `batch_size` : pages par appel ; une seule sur CPU → lots de reconnaissance de 1.
+    """
+    options: Dict[str, object] = {}
+    on_gpu = _paddle_on_gpu()
+    if batch_size == 1 and not on_gpu:
+        # Lots de 6 par défaut : ~2 Go d'arènes mémoire réservées, inutiles page par page
+        options["rec_batch_num"] = 1
+    if hpi:
+        options["enable_hpi"] = True
+    if quantize:
+        major = _paddleocr_major()
+        if major is not None and major >= 3:
+            raise SystemExit(
+                f"--quantize : PaddleOCR {major}.x n'accepte pas l'inférence INT8 (precision=\"int8\"). "
+                "Retirer l'option, ou utiliser PaddleOCR 2.x."
+            )
+        options["precision"] = "int8"
+        if on_gpu:
+            options["use_tensorrt"] = True
+        else:
+            options["enable_mkldnn"] = True
+            if _cpu_has_vnni() is False:
+                print("[WARN] CPU sans VNNI : l'inférence INT8 sera peu plus rapide que FP32")
+    if det_model_dir:
+        options["det_model_dir"] = det_model_dir
+    if rec_model_dir:
+        options["rec_model_dir"] = rec_model_dir
+    return options
+
+
+def _rejected_paddle_option(exc: Exception, options: Dict[str, object]) -> Optional[str]:
+    """Option de `options` nommée dans l'erreur de PaddleOCR (ex: "Unknown argument: x")."""
+    message = str(exc)
+    # La plus longue d'abord : un nom ne doit pas être pris pour un autre qui le contient
+    for key in sorted(options, key=len, reverse=True):
+        if key in message:
+            return key
+    return None
+
+
+def _create_paddle_ocr(lang: str, options: Optional[Dict[str, object]] = None):
+    """Instance PaddleOCR ; les options facultatives (INT8, HPI, lots) refusées sont retirées.
+
+    Seul le groupe de l'option refusée est retiré. Un modèle explicite (det/rec_model_dir)
+    refusé, ou une erreur qui persiste avec lui, arrête le programme (SystemExit) au lieu
+    de se replier sur le modèle par défaut.
+    """
+    if not _paddle_is_usable():
         raise RuntimeError("PaddleOCR non installé")
+    options = dict(options or {})
+    while True:
+        try:
+            return _new_paddle_ocr(lang, options)
+        except (TypeError, ValueError, RuntimeError, ImportError) as exc:
+            rejected = _rejected_paddle_option(exc, options)
+            if rejected in _REQUIRED_PADDLE_OPTIONS:
+                raise SystemExit(f"PaddleOCR refuse {rejected}={options[rejected]!r} : {exc}")
+            if rejected is not None:
+                group = next((keys for keys in _OPTIONAL_PADDLE_OPTIONS if rejected in keys), None)
+            else:
+                group = next(
+                    (keys for keys in _OPTIONAL_PADDLE_OPTIONS if any(key in options for key in keys)),
+                    None,
+                )
+            if group is None:
+                models = [key for key in _REQUIRED_PADDLE_OPTIONS if key in options]
+                if models:
+                    raise SystemExit(f"PaddleOCR inutilisable avec {', '.join(models)} : {exc}")
+                raise
+            present = [key for key in group if key in options]
+            print(f"[WARN] Option PaddleOCR {', '.join(present)} refusée ({exc}) : ignorée")
+            for key in present:
+                del options[key]
+
+
+def _new_paddle_ocr(lang: str, options: Dict[str, object]):
+    from paddleocr import PaddleOCR
+
     # API a évolué: use_angle_cls est déprécié au profit de use_textline_orientation
     try:
-        return PaddleOCR(use_textline_orientation=True, lang=lang)
+        return PaddleOCR(use_textline_orientation=True, lang=lang, **options)
     except TypeError:
-        return PaddleOCR(use_angle_cls=True, lang=lang)
+        return PaddleOCR(use_angle_cls=True, lang=lang, **options)
+
+
+def _warm_up_paddle(ocr) -> None:
+    """Inférence à blanc : initialisation et compilation des noyaux hors de la page 1.
+
+    Même appel que pour les pages (`_paddle_ocr_pages`) : une erreur d'API n'est pas masquée.
+    """
+    _paddle_ocr_pages(ocr, [np.zeros((1200, 1200, 3), np.uint8)])
 
 
 def _windows_ocr_available() -> bool:
@@ -215,38 +663,241 @@ def _get_available_ocr_languages() -> List[str]:
         return []
 
 
-def _windows_ocr_image_text(image_bgr: np.ndarray, lang: Optional[str]) -> str:
-    if not _windows_ocr_available():
-        raise RuntimeError(
-            "OCR Windows indisponible. Installez les wheels WinRT avec: "
-            "pip install winrt-Windows.Media.Ocr winrt-Windows.Graphics.Imaging "
-            "winrt-Windows.Storage.Streams winrt-Windows.Globalization"
-        )
+# Cache persistant Windows OCR : empreinte de l'image encodée + langue → texte reconnu.
+# None = cache désactivé (ou pas encore chargé).
+_OCR_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ocr_repo", "windows_ocr_cache.json")
+_OCR_CACHE_MAX = 2000
+_OCR_CACHE: Optional[Dict[str, str]] = None
+_ocr_cache_dirty = False
 
-    import asyncio
 
-    from winrt.windows.globalization import Language
-    from winrt.windows.graphics.imaging import BitmapDecoder
-    from winrt.windows.media.ocr import OcrEngine
-    from winrt.windows.storage.streams import DataWriter, InMemoryRandomAccessStream
+def _image_digest(image_bytes) -> str:
+    """Empreinte 128 bits des octets de l'image (bytes ou memoryview), préfixée par l'algorithme."""
+    if blake3 is not None:
+        return "b3:" + blake3.blake3(image_bytes).hexdigest(length=16)
+    if xxhash is not None:
+        return "xx3:" + xxhash.xxh3_128_hexdigest(image_bytes)
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
 
-    ok, buf = cv2.imencode(".png", image_bgr)
-    if not ok:
-        return ""
-    png_bytes = buf.tobytes()
 
-    async def _get_bitmap():
-        stream = InMemoryRandomAccessStream()
-        writer = DataWriter(stream)
-        writer.write_bytes(png_bytes)
-        await writer.store_async()
-        await writer.flush_async()
-        writer.detach_stream()
-        stream.seek(0)
-        decoder = await BitmapDecoder.create_async(stream)
-        return await decoder.get_software_bitmap_async()
+def _enable_ocr_cache() -> None:
+    """Charge le cache depuis le disque (vide s'il est absent ou illisible)."""
+    global _OCR_CACHE
+    try:
+        with open(_OCR_CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        _OCR_CACHE = data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        _OCR_CACHE = {}
+
+
+def _store_ocr_cache(key: str, text: str) -> None:
+    global _ocr_cache_dirty
+    if _OCR_CACHE is not None:
+        _OCR_CACHE[key] = text
+        _ocr_cache_dirty = True
+
+
+def _save_ocr_cache() -> None:
+    """Écrit le cache s'il a changé (remplacement atomique, erreurs ignorées)."""
+    global _ocr_cache_dirty
+    if _OCR_CACHE is None or not _ocr_cache_dirty:
+        return
+    # Garder les entrées les plus récentes (ordre d'insertion)
+    entries = list(_OCR_CACHE.items())[-_OCR_CACHE_MAX:]
+    tmp_path = _OCR_CACHE_PATH + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(_OCR_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entries), f, ensure_ascii=False)
+        os.replace(tmp_path, _OCR_CACHE_PATH)
+        _ocr_cache_dirty = False
+    except OSError:
+        pass
+
+
+# Cache des documents entiers (--cache-documents) : empreinte du fichier + moteur + options
+# qui changent le texte → texte. Au-delà de _DOC_CACHE_MAX fichiers, les moins récemment
+# utilisés sont supprimés.
+_DOC_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ocr_repo", "documents")
+_DOC_CACHE_MAX = 500
+
+
+def _expected_backend() -> str:
+    """Moteur qui sera vraisemblablement retenu, sans importer Paddle (recherche des paquets)."""
+    try:
+        if importlib.util.find_spec("paddle") and importlib.util.find_spec("paddleocr"):
+            return "paddle"
+    except (ImportError, ValueError):
+        pass
+    return "windows"
+
+
+def _ocr_engine_identity(backend: str) -> str:
+    """Moteur et version : un autre moteur (ou une mise à jour) donne un autre texte."""
+    if backend == "paddle":
+        try:
+            return "paddleocr-" + importlib.metadata.version("paddleocr")
+        except importlib.metadata.PackageNotFoundError:
+            return "paddleocr"
+    # Les modèles Windows OCR suivent la version du système
+    return "windows-" + platform.version()
+
+
+def _document_cache_path(input_path: str, args: argparse.Namespace, backend: str) -> Optional[str]:
+    """Fichier du cache pour ce document, ce moteur et ces options.
+
+    None si le cache n'est pas demandé (--cache-documents, sans --no-cache) ou si l'entrée est illisible.
+    """
+    if not args.cache_documents or args.no_cache:
+        return None
+    try:
+        with open(input_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+    options = json.dumps([
+        _ocr_engine_identity(backend), args.hpi,
+        args.lang, args.max_pages, args.force_ocr, args.aggressive_preprocess,
+        args.denoise, args.quantize, args.det_model_dir, args.rec_model_dir,
+    ])
+    options_digest = hashlib.blake2b(options.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(_DOC_CACHE_DIR, f"{_image_digest(content).replace(':', '-')}-{options_digest}.txt")
+
+
+def _load_document_cache(cache_path: Optional[str]) -> Optional[str]:
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return None
+    try:
+        # Date d'utilisation : les entrées reprises échappent à l'éviction
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return text
+
+
+def _evict_document_cache() -> None:
+    """Ne garde que les _DOC_CACHE_MAX fichiers les plus récemment utilisés."""
+    try:
+        entries = [e for e in os.scandir(_DOC_CACHE_DIR) if e.name.endswith(".txt")]
+        if len(entries) <= _DOC_CACHE_MAX:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+    except OSError:
+        return
+    for entry in entries[:-_DOC_CACHE_MAX]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _store_document_cache(cache_path: Optional[str], text: str) -> None:
+    """Enregistre le texte du document (remplacement atomique, erreurs ignorées).
+
+    Un texte vide (OCR en échec, page blanche) n'est pas gardé : il serait repris tel quel.
+    """
+    if cache_path is None or not text:
+        return
+    tmp_path = cache_path + ".tmp"
+    try:
+        os.makedirs(_DOC_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+    _evict_document_cache()
+
+
+def _merge_multilang_results(results: Dict[str, str], priority: List[str]) -> str:
+    """Fusionne les passes OCR par langue (`results` : tag → texte non vide).
+
+    - FR (ou EN) = texte principal avec données chiffrées
+    - AR = ajouter UNIQUEMENT les lignes contenant de l'arabe
+      (le reste est une ré-OCR dégradée du français)
+    """
+    if len(results) == 1:
+        return list(results.values())[0]
+
+    # Prendre FR comme base, sinon EN, sinon premier disponible
+    base_tag = None
+    for pref in ["fr", "en"]:
+        for tag in priority:
+            if tag.startswith(pref) and tag in results:
+                base_tag = tag
+                break
+        if base_tag:
+            break
+    if not base_tag:
+        base_tag = list(results.keys())[0]
+
+    base_text = results[base_tag]
+    base_lines_lower = {l.lower() for l in map(str.strip, base_text.split("\n")) if l}
+
+    extra_lines: List[str] = []
+    for tag, text in results.items():
+        # Pour les autres langues : ignorer (doublon du FR)
+        if tag == base_tag or not tag.startswith("ar"):
+            continue
+        for line in text.split("\n"):
+            stripped = line.strip()
+            # Pour la passe arabe : n'ajouter que les lignes
+            # qui contiennent effectivement de l'arabe
+            if not stripped or not _ARABIC_RE.search(stripped):
+                continue
+            lowered = stripped.lower()
+            if lowered not in base_lines_lower:
+                extra_lines.append(stripped)
+                base_lines_lower.add(lowered)
+
+    combined = base_text
+    if extra_lines:
+        combined += "\n" + "\n".join(extra_lines)
+    return combined
+
+
+class WindowsOcrSession:
+    """Session OCR Windows partagée entre les pages d'un document.
+
+    Une seule boucle asyncio et un moteur `OcrEngine` par langue, créés une
+    fois ; `close()` (ou `with`) libère la boucle.
+    """
+
+    def __init__(self, lang: Optional[str]):
+        if not _windows_ocr_available():
+            raise RuntimeError(
+                "OCR Windows indisponible. Installez les wheels WinRT avec: "
+                "pip install winrt-Windows.Media.Ocr winrt-Windows.Graphics.Imaging "
+                "winrt-Windows.Storage.Streams winrt-Windows.Globalization"
+            )
+        self.lang = lang
+        self._loop = asyncio.new_event_loop()
+        self._engines: Dict[Optional[str], object] = {}
+        self._priority: Optional[List[str]] = None
+        self._cache_suffix: Optional[str] = None
+
+    def __enter__(self) -> "WindowsOcrSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._loop.close()
+
+    def _engine(self, language_tag: Optional[str]):
+        """Moteur de la langue demandée (ou du profil utilisateur), mis en cache."""
+        if language_tag in self._engines:
+            return self._engines[language_tag]
+        from winrt.windows.globalization import Language
+        from winrt.windows.media.ocr import OcrEngine
 
-    async def _ocr_single(bitmap, language_tag: Optional[str]) -> str:
         engine = None
         if language_tag:
             try:
@@ -255,145 +906,286 @@ def _windows_ocr_image_text(image_bgr: np.ndarray, lang: Optional[str]) -> str:
                 engine = None
         if engine is None:
             engine = OcrEngine.try_create_from_user_profile_languages()
+        self._engines[language_tag] = engine
+        return engine
+
+    def _languages(self) -> List[str]:
+        """Langues installées, par priorité fr > en > ar > reste (calculé une fois)."""
+        if self._priority is None:
+            available = _get_available_ocr_languages()
+            priority: List[str] = []
+            for pref in ["fr", "en", "ar"]:
+                for tag in available:
+                    if tag.startswith(pref) and tag not in priority:
+                        priority.append(tag)
+            for tag in available:
+                if tag not in priority:
+                    priority.append(tag)
+            self._priority = priority
+        return self._priority
+
+    @staticmethod
+    def _bitmap_from_pixels(image_bgr: np.ndarray):
+        """SoftwareBitmap BGRA8 copié directement des pixels : ni encodage ni décodage."""
+        from winrt.windows.graphics.imaging import BitmapPixelFormat, SoftwareBitmap
+        from winrt.windows.storage.streams import DataWriter
+
+        h, w = image_bgr.shape[:2]
+        writer = DataWriter()
+        writer.write_bytes(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2BGRA).tobytes())
+        return SoftwareBitmap.create_copy_from_buffer(writer.detach_buffer(), BitmapPixelFormat.BGRA8, w, h)
+
+    def _to_bitmap(self, image_bgr: np.ndarray):
+        try:
+            return self._bitmap_from_pixels(image_bgr)
+        except Exception:
+            pass
+        # Repli : BMP décodé par BitmapDecoder. BMP plutôt que PNG : pas de
+        # compression zlib (même au niveau 1, le PNG reste plus lent à écrire puis à relire)
+        ok, buf = cv2.imencode(".bmp", image_bgr)
+        if not ok:
+            return None
+        return self._loop.run_until_complete(self._get_bitmap(buf.tobytes()))
+
+    async def _get_bitmap(self, image_bytes: bytes):
+        from winrt.windows.graphics.imaging import BitmapDecoder
+        from winrt.windows.storage.streams import DataWriter, InMemoryRandomAccessStream
+
+        stream = InMemoryRandomAccessStream()
+        writer = DataWriter(stream)
+        writer.write_bytes(image_bytes)
+        await writer.store_async()
+        await writer.flush_async()
+        writer.detach_stream()
+        stream.seek(0)
+        decoder = await BitmapDecoder.create_async(stream)
+        return await decoder.get_software_bitmap_async()
+
+    async def _ocr_single(self, bitmap, language_tag: Optional[str]) -> str:
+        engine = self._engine(language_tag)
         if engine is None:
             return ""
         result = await engine.recognize_async(bitmap)
         return (result.text or "").strip()
 
-    async def _run() -> str:
-        bitmap = await _get_bitmap()
-
+    async def _run(self, bitmap) -> str:
         # Si une langue est spécifiée, OCR simple
-        if lang:
-            return await _ocr_single(bitmap, lang)
+        if self.lang:
+            return await self._ocr_single(bitmap, self.lang)
 
         # Mode bilingual : détecter toutes les langues disponibles et
         # faire une passe par langue, puis fusionner
-        available = _get_available_ocr_languages()
-        if len(available) <= 1:
-            return await _ocr_single(bitmap, available[0] if available else None)
+        priority = self._languages()
+        if len(priority) <= 1:
+            return await self._ocr_single(bitmap, priority[0] if priority else None)
 
         # Passe multi-langue : FR d'abord (données principales),
-        # puis les autres langues pour compléter
-        results: dict[str, str] = {}
-        # Prioriser fr > en > ar > reste
-        priority = []
-        for pref in ["fr", "en", "ar"]:
-            for tag in available:
-                if tag.startswith(pref) and tag not in priority:
-                    priority.append(tag)
-        for tag in available:
-            if tag not in priority:
-                priority.append(tag)
-
+        # puis les autres langues pour compléter.
+        # recognize_async ne modifie pas le bitmap : un seul décodage pour toutes les passes
+        results: Dict[str, str] = {}
         for tag in priority:
             try:
-                bitmap_copy = await _get_bitmap()  # Bitmap frais pour chaque passe
-                text = await _ocr_single(bitmap_copy, tag)
+                text = await self._ocr_single(bitmap, tag)
                 if text:
                     results[tag] = text
             except Exception:
                 pass
 
         if not results:
-            return await _ocr_single(bitmap, None)
-
-        # Fusionner intelligemment :
-        # - FR (ou EN) = texte principal avec données chiffrées
-        # - AR = ajouter UNIQUEMENT les lignes contenant de l'arabe
-        #   (le reste est une ré-OCR dégradée du français)
-        import re as _re
-        _arabic_re = _re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
-
-        if len(results) == 1:
-            return list(results.values())[0]
-
-        # Prendre FR comme base, sinon EN, sinon premier disponible
-        base_tag = None
-        for pref in ["fr", "en"]:
-            for tag in priority:
-                if tag.startswith(pref) and tag in results:
-                    base_tag = tag
-                    break
-            if base_tag:
-                break
-        if not base_tag:
-            base_tag = list(results.keys())[0]
+            return await self._ocr_single(bitmap, None)
+        return _merge_multilang_results(results, priority)
 
-        base_text = results[base_tag]
-        base_lines_lower = set(
-            l.strip().lower() for l in base_text.split("\n") if l.strip()
-        )
+    def warm_up(self) -> None:
+        """Crée les moteurs et lance une reconnaissance à blanc (hors page 1)."""
+        try:
+            bitmap = self._to_bitmap(np.zeros((1, 1, 3), np.uint8))
+            if bitmap is not None:
+                self._loop.run_until_complete(self._run(bitmap))
+        except Exception:
+            pass
 
-        extra_lines: List[str] = []
-        for tag, text in results.items():
-            if tag == base_tag:
-                continue
-            for line in text.split("\n"):
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                # Pour la passe arabe : n'ajouter que les lignes
-                # qui contiennent effectivement de l'arabe
-                if tag.startswith("ar"):
-                    if _arabic_re.search(stripped) and stripped.lower() not in base_lines_lower:
-                        extra_lines.append(stripped)
-                        base_lines_lower.add(stripped.lower())
-                # Pour les autres langues : ignorer (doublon du FR)
-
-        combined = base_text
-        if extra_lines:
-            combined += "\n" + "\n".join(extra_lines)
-        return combined
+    def _recognizer_languages(self) -> str:
+        """Langues des moteurs réellement employés par _run (repli sur le profil compris)."""
+        if self.lang:
+            tags: List[Optional[str]] = [self.lang]
+        else:
+            priority = self._languages()
+            tags = list(priority) if len(priority) > 1 else [priority[0] if priority else None]
+        resolved = []
+        for tag in tags:
+            language = getattr(self._engine(tag), "recognizer_language", None)
+            resolved.append(getattr(language, "language_tag", None) or "none")
+        return "+".join(resolved)
+
+    def _cache_key(self, pixels: np.ndarray) -> str:
+        # Même page (mêmes pixels), même version du moteur et mêmes langues reconnues
+        # (celles des moteurs résolus, pas l'option --lang) : texte déjà reconnu
+        if self._cache_suffix is None:
+            self._cache_suffix = f"{_ocr_engine_identity('windows')}:{self._recognizer_languages()}"
+        h, w = pixels.shape[:2]
+        return f"{_image_digest(memoryview(pixels))}:{w}x{h}:{self._cache_suffix}"
+
+    def ocr_images(self, images: List[np.ndarray]) -> List[str]:
+        """Textes reconnus sur des images BGR, les pages étant reconnues en même temps.
+
+        Les appels WinRT de toutes les pages sont en vol ensemble sur la boucle de
+        la session (asyncio.gather) ; les pages déjà en cache ne sont pas relancées.
+        """
+        pixels = [np.ascontiguousarray(img) for img in images]
+        keys = [self._cache_key(p) for p in pixels]
+        texts = [_OCR_CACHE.get(k) if _OCR_CACHE is not None else None for k in keys]
+        todo = [(i, self._to_bitmap(pixels[i])) for i, text in enumerate(texts) if text is None]
+        todo = [(i, bitmap) for i, bitmap in todo if bitmap is not None]
+        if todo:
+            async def _gather() -> List[str]:
+                return await asyncio.gather(*[self._run(bitmap) for _, bitmap in todo])
+
+            for (i, _), text in zip(todo, self._loop.run_until_complete(_gather())):
+                texts[i] = text
+                if text:
+                    # Texte vide (moteur absent, échec passager) : reconnu à nouveau la fois suivante
+                    _store_ocr_cache(keys[i], text)
+        return [text or "" for text in texts]
 
-    try:
-        return asyncio.run(_run())
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(_run())
-        finally:
-            loop.close()
+    def ocr_image(self, image_bgr: np.ndarray) -> str:
+        """Texte reconnu sur une image BGR."""
+        return self.ocr_images([image_bgr])[0]
+
+
+def _windows_ocr_image_text(image_bgr: np.ndarray, lang: Optional[str]) -> str:
+    """OCR Windows d'une seule image (session éphémère)."""
+    with WindowsOcrSession(lang) as session:
+        return session.ocr_image(image_bgr)
+
+
+def _is_paddle_word(item) -> bool:
+    """Vrai pour un mot PaddleOCR : [box, (texte, score)]."""
+    return (
+        isinstance(item, (list, tuple)) and len(item) >= 2
+        and isinstance(item[1], (list, tuple)) and len(item[1]) >= 1
+        and isinstance(item[1][0], str)
+    )
 
 
 def _extract_text_from_paddle_result(result) -> str:
     # Formats rencontrés selon versions:
     # - pages:  [ [ [box, (text, score)], ... ], [ ... ], ... ]
     # - 1 page: [ [box, (text, score)], ... ]
-    if result is None:
+    # La forme est décidée une fois, sur le 1er élément.
+    if not isinstance(result, list) or not result:
         return ""
-
-    def is_word(item) -> bool:
-        if not isinstance(item, (list, tuple)) or len(item) < 2:
-            return False
-        meta = item[1]
-        if not isinstance(meta, (list, tuple)) or len(meta) < 1:
-            return False
-        return isinstance(meta[0], str)
-
-    def is_page(item) -> bool:
-        return isinstance(item, list) and (len(item) == 0 or is_word(item[0]))
-
-    pages: List[list]
-    if isinstance(result, list) and len(result) > 0 and is_page(result[0]):
-        # Liste de pages
-        pages = result  # type: ignore[assignment]
-    elif isinstance(result, list) and (len(result) == 0 or is_word(result[0])):
+    first = result[0]
+    if isinstance(first, list) and (not first or _is_paddle_word(first[0])):
+        # Liste de pages (une page sans texte peut valoir None)
+        pages = result
+    elif _is_paddle_word(first):
         # Une seule page
         pages = [result]
     else:
-        pages = []
+        return ""
+
+    # Le contrôle _is_paddle_word par mot est gardé : ~2 ms pour 10 000 mots
+    # (0,6 ms sans), négligeable devant l'OCR, et un mot mal formé est ignoré
+    # au lieu de produire du texte faux
+    return "\n".join([
+        text
+        for page in pages if page
+        for word in page
+        if _is_paddle_word(word) and (text := word[1][0].strip())
+    ])
+
+
+def _paddle_accepts_lists(ocr) -> bool:
+    """Vrai si l'instance sait traiter plusieurs pages par appel (PaddleOCR 3 : `predict`).
+
+    PaddleOCR 2.x ne le sait pas : avec une liste et la détection active, `ocr.ocr`
+    appelle exit(0) (SystemExit, pas une exception ordinaire) ; on ne l'essaie donc jamais.
+    """
+    return callable(getattr(ocr, "predict", None))
+
+
+def _paddle_page_text(page) -> str:
+    """Texte d'une page rendue par `predict` (PaddleOCR 3 : champ rec_texts) ou ancien format."""
+    if isinstance(page, dict) and "rec_texts" in page:
+        return "\n".join([text for raw in page["rec_texts"] if (text := str(raw).strip())])
+    return _extract_text_from_paddle_result([page])
+
+
+def _paddle_ocr_pages(ocr, images: List[np.ndarray]) -> List[str]:
+    """Texte PaddleOCR de plusieurs pages, en un seul appel si la version accepte une liste.
+
+    PaddleOCR 3 : toujours `predict` (même pour une page) ; `ocr(img, cls=True)` y lève
+    TypeError et ses résultats (dict) ne sont pas au format 2.x.
+    """
+    if _paddle_accepts_lists(ocr):
+        results = list(ocr.predict(images))
+        # Un résultat par page attendu ; sinon : une page à la fois
+        if len(results) != len(images):
+            results = [next(iter(ocr.predict(img)), None) for img in images]
+        return [_paddle_page_text(page) for page in results]
+    return [_extract_text_from_paddle_result(ocr.ocr(img, cls=True)) for img in images]
+
+
+def _preprocess_page(preprocess, page: Union[np.ndarray, str]) -> Union[np.ndarray, str]:
+    """Pré-traite une page image ; une page déjà en texte passe telle quelle."""
+    return page if isinstance(page, str) else preprocess(page)
+
+
+def _ocr_with_text_pages(
+    ocr_images: Callable[[List[np.ndarray]], List[str]], pages: List[Union[np.ndarray, str]]
+) -> List[str]:
+    """Textes des pages d'un lot : seules les images passent par `ocr_images`."""
+    images = [page for page in pages if not isinstance(page, str)]
+    texts = iter(ocr_images(images) if images else [])
+    return [page if isinstance(page, str) else next(texts) for page in pages]
 
-    lines: List[str] = []
-    for page in pages:
-        for word in page:
-            if not is_word(word):
-                continue
-            text = word[1][0]
-            if text.strip():
-                lines.append(text.strip())
 
-    return "\n".join(lines)
+# Instance PaddleOCR propre à chaque processus du pool (le prédicteur n'est pas picklable)
+_WORKER_OCR = None
+
+
+def _init_paddle_worker(
+    lang: str, options: Optional[Dict[str, object]] = None, omp_threads: Optional[int] = None
+) -> None:
+    global _WORKER_OCR
+    # Avant le premier import de Paddle (processus neuf, import paresseux) : lu à son
+    # initialisation seulement. Une valeur fixée par l'utilisateur est conservée.
+    if omp_threads:
+        os.environ.setdefault("OMP_NUM_THREADS", str(omp_threads))
+    # Le processus ne fait que l'OCR : pas de threads OpenCV en plus de ceux de Paddle
+    cv2.setNumThreads(1)
+    _WORKER_OCR = _create_paddle_ocr(lang, options)
+    _warm_up_paddle(_WORKER_OCR)
+
+
+def _paddle_worker_pages(pages: List[Union[np.ndarray, str]]) -> List[str]:
+    """Tâche d'un processus du pool : OCR des pages (déjà pré-traitées) reçues."""
+    return _ocr_with_text_pages(functools.partial(_paddle_ocr_pages, _WORKER_OCR), pages)
+
+
+def _iter_pool_results(pool: Executor, fn, batches: Iterable[list], window: int) -> Iterator[Tuple[int, List[str]]]:
+    """(nombre de pages, textes) par lot, dans l'ordre des lots.
+
+    Au plus `window` lots en vol : les pages ne sont pas toutes chargées d'avance.
+    """
+    pending: deque = deque()
+    for batch in batches:
+        pending.append((len(batch), pool.submit(fn, batch)))
+        if len(pending) >= window:
+            n, future = pending.popleft()
+            yield n, future.result()
+    while pending:
+        n, future = pending.popleft()
+        yield n, future.result()
+
+
+def _save_debug_images(images: Iterable[Union[np.ndarray, str]]) -> Iterator[Union[np.ndarray, str]]:
+    # JPEG (libjpeg-turbo, SIMD) : ~10× plus rapide à écrire que le PNG (Deflate),
+    # largement suffisant pour un contrôle visuel
+    for idx, img in enumerate(images, start=1):
+        if not isinstance(img, str):
+            cv2.imwrite(f"cleaned_{idx}.jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        yield img
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -404,16 +1196,25 @@ def main(argv: Optional[List[str]] = None) -> int:
             "  python main.py -i facture.pdf                    (OCR simple)\n"
             "  python main.py -i facture.pdf --carbon            (extraction carbone)\n"
             "  python main.py -i facture.jpg --carbon -o res.json\n"
-            "  python main.py -i scan.webp --max-pages 3"
+            "  python main.py -i scan.webp --max-pages 3\n"
+            "  find factures -name '*.pdf' | python main.py --serve --carbon"
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
         "--input",
         "-i",
-        required=True,
+        default=None,
         help="Chemin vers une image (png/jpg/webp/bmp/tiff/...) ou un PDF.",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help=(
+            "Mode service : moteur OCR chargé une fois, chemins lus sur stdin (un par ligne), "
+            "un résultat JSON par ligne sur stdout. Pages traitées dans ce processus (--workers ignoré)."
+        ),
+    )
     parser.add_argument(
         "--lang",
         "-l",
@@ -432,31 +1233,159 @@ def main(argv: Optional[List[str]] = None) -> int:
         default=None,
         help="Nombre max de pages (PDF). Par défaut: toutes les pages.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help=(
+            "Nombre de pages par appel OCR (PaddleOCR : ex. 8 sur GPU ; Windows OCR : pages "
+            "reconnues en même temps ; 0 = toutes les pages en un seul appel). Par défaut: 1."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "PaddleOCR : nombre de processus OCR (une instance PaddleOCR chacun, "
+            "~1 Go de RAM par processus). Par défaut: 1."
+        ),
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="PDF : nombre de processus de rendu des pages (ex: nombre de cœurs). Par défaut: 1.",
+    )
+    parser.add_argument(
+        "--force-ocr",
+        action="store_true",
+        help="PDF : OCR de toutes les pages, même celles qui portent déjà du texte (couche texte douteuse).",
+    )
     parser.add_argument(
         "--debug-images",
         action="store_true",
         help="Sauvegarde les images pré-traitées (utile pour diagnostiquer l'OCR).",
     )
+    parser.add_argument(
+        "--denoise",
+        choices=_DENOISE_MODES,
+        default="auto",
+        help=(
+            "Windows OCR : débruitage des pages (auto = filtre bilatéral si la page est bruitée ; "
+            "light = filtre bilatéral, strong = moyennes non locales, lent ; none = aucun). "
+            "Par défaut: auto."
+        ),
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help=(
+            "PaddleOCR 2.x : inférence INT8 (TensorRT sur GPU, MKL-DNN sur CPU), repli FP32 sinon. "
+            "Refusé avec PaddleOCR 3."
+        ),
+    )
+    parser.add_argument(
+        "--hpi",
+        action="store_true",
+        help=(
+            "PaddleOCR 3 : inférence haute performance (enable_hpi), moteur choisi par Paddle "
+            "(OpenVINO, ONNX Runtime, TensorRT). Repli sur le moteur standard."
+        ),
+    )
+    parser.add_argument(
+        "--det-model-dir",
+        default=None,
+        help="PaddleOCR : dossier d'un modèle de détection (ex: modèle INT8 quantifié).",
+    )
+    parser.add_argument(
+        "--rec-model-dir",
+        default=None,
+        help="PaddleOCR : dossier d'un modèle de reconnaissance (ex: modèle INT8 quantifié).",
+    )
+    parser.add_argument(
+        "--aggressive-preprocess",
+        action="store_true",
+        help="PaddleOCR : binarisation adaptative des pages (scans très dégradés).",
+    )
+    parser.add_argument(
+        "--opencl",
+        action="store_true",
+        help="Pré-traitement OpenCV sur GPU via OpenCL, si un périphérique est disponible.",
+    )
+    parser.add_argument(
+        "--cache-documents",
+        action="store_true",
+        help=(
+            "Garder le texte des documents traités (~/.cache/ocr_repo/documents, "
+            f"{_DOC_CACHE_MAX} au plus) et le reprendre si le même fichier revient avec les mêmes options."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ne pas utiliser les caches (pages Windows OCR déjà reconnues, et --cache-documents).",
+    )
+    parser.add_argument(
+        "--print-final",
+        action="store_true",
+        help="Mode OCR classique : affiche aussi le texte extrait à la fin (il est écrit page par page dans le fichier).",
+    )
     parser.add_argument(
         "--carbon",
         action="store_true",
         help="Mode carbone : extrait les données environnementales et calcule les émissions CO₂.",
     )
     args = parser.parse_args(argv)
+    if not args.serve and not args.input:
+        parser.error("--input est requis (sauf avec --serve)")
+
+    # Mode service : stdout est réservé aux résultats JSON, les messages vont sur stderr
+    results_out = sys.stdout
+    if args.serve:
+        with contextlib.redirect_stdout(sys.stderr):
+            return _main(args, results_out)
+    return _main(args, results_out)
+
+
+def _main(args: argparse.Namespace, results_out) -> int:
+    def _open(input_path: str) -> Tuple[int, Iterator[Union[np.ndarray, str]], bool]:
+        opened = _open_images(
+            input_path,
+            max_pages=args.max_pages,
+            render_workers=max(1, args.render_workers),
+            use_text_layer=not args.force_ocr,
+        )
+        print(f"\n[INFO] Fichier: {input_path}")
+        print(f"[INFO] Pages à traiter: {opened[0]}")
+        return opened
+
+    # --- Ouvrir l'entrée (les pages PDF sont rendues au fil de l'eau) ---
+    # Avant le chargement du moteur : une entrée invalide échoue tout de suite
+    opened = None if args.serve else _open(args.input)
 
     # --- Sortie automatique si non spécifiée ---
-    if args.output:
+    if args.serve:
+        output_path = None
+    elif args.output:
         output_path = args.output
     elif args.carbon:
         output_path = _make_output_path(args.input, "_carbone.json")
     else:
         output_path = _make_output_path(args.input, "_ocr.txt")
 
-    # --- Charger toutes les pages ---
-    images = _load_images(args.input, max_pages=args.max_pages)
-    total_pages = len(images)
-    print(f"\n[INFO] Fichier: {args.input}")
-    print(f"[INFO] Pages à traiter: {total_pages}")
+    # Document déjà traité avec les mêmes options : ni moteur OCR, ni rendu
+    # (clé du moteur attendu ; le moteur n'est chargé qu'en l'absence du texte)
+    expected_backend = _expected_backend()
+    cache_path = None if args.serve else _document_cache_path(args.input, args, expected_backend)
+    cached = _load_document_cache(cache_path)
+    if cached is not None:
+        print("[INFO] Document déjà traité : texte repris du cache")
+        if not args.carbon:
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(cached)
+                f.write("\n")
+        return _report(args, output_path, cached)
 
     # --- Choix du moteur OCR ---
     backend: str
@@ -466,15 +1395,36 @@ def main(argv: Optional[List[str]] = None) -> int:
     if _paddle_is_usable():
         try:
             paddle_lang = lang if lang else "fr"  # PaddleOCR nécessite une langue
-            ocr = _create_paddle_ocr(paddle_lang)
+            # Options (et avertissements) seulement si PaddleOCR est bien le moteur retenu
+            paddle_options = _paddle_options(
+                args.quantize, args.det_model_dir, args.rec_model_dir, args.hpi, args.batch_size
+            )
+            # Pool possible (--workers) : l'instance n'est créée qu'au besoin (document d'un
+            # seul lot), les processus du pool ayant chacun la leur
+            if args.serve or args.workers <= 1:
+                ocr = _create_paddle_ocr(paddle_lang, paddle_options)
+                accepts_lists = _paddle_accepts_lists(ocr)
+            else:
+                accepts_lists = (_paddleocr_major() or 0) >= 3
             backend = "paddle"
             print(f"[INFO] Moteur OCR: PaddleOCR (langue: {paddle_lang})")
+            if args.batch_size != 1 and not accepts_lists:
+                # PaddleOCR 2.x : une page par appel, un lot ne ferait que garder les pages en mémoire
+                print("[WARN] Cette version de PaddleOCR traite une page par appel : --batch-size ignoré")
+                args.batch_size = 1
+                if not _paddle_on_gpu():
+                    # Processus du pool : lots de reconnaissance de 1, comme pour --batch-size 1
+                    paddle_options["rec_batch_num"] = 1
         except Exception:
             ocr = None
             backend = "windows"
     else:
         backend = "windows"
 
+    if cache_path is not None and backend != expected_backend:
+        # Moteur attendu inutilisable : le texte est rangé sous le moteur réellement employé
+        cache_path = _document_cache_path(args.input, args, backend)
+
     if backend == "windows":
         if not _windows_ocr_available():
             raise SystemExit(
@@ -495,27 +1445,142 @@ def main(argv: Optional[List[str]] = None) -> int:
             else:
                 print("[INFO] Moteur OCR: Windows OCR (langue du système)")
 
-    # --- Extraction du texte ---
-    extracted_pages: List[str] = []
-    for idx, img in enumerate(images, start=1):
-        print(f"[INFO] Traitement page {idx}/{total_pages}...", end=" ", flush=True)
-
-        if backend == "paddle":
-            cleaned = _preprocess_heavy(img)
-            if args.debug_images:
-                cv2.imwrite(f"cleaned_{idx}.png", cleaned)
-            result = ocr.ocr(cleaned, cls=True)
-            extracted_pages.append(_extract_text_from_paddle_result(result))
+    opencl = args.opencl and _opencl_is_usable()
+    if opencl:
+        cv2.ocl.setUseOpenCL(True)
+        print("[INFO] Pré-traitement: OpenCL (GPU)")
+    elif args.opencl:
+        print("[INFO] OpenCL indisponible : pré-traitement sur CPU")
+    # Débruitage fort (moyennes non locales) : 20 à 100× plus rapide sur GPU NVIDIA
+    cuda = backend == "windows" and args.denoise == "strong" and _cuda_is_usable()
+    if cuda:
+        print("[INFO] Débruitage: CUDA (GPU)")
+    if backend == "paddle":
+        # Le pré-traitement (threads B) tourne en même temps que PaddleOCR :
+        # un seul thread OpenCV, les cœurs restent aux threads MKL-DNN
+        cv2.setNumThreads(1)
+    if backend == "windows" and not args.no_cache:
+        _enable_ocr_cache()
+
+    # Une session (boucle asyncio + moteurs) pour toutes les pages et tous les documents
+    session = WindowsOcrSession(lang) if backend == "windows" else None
+    warmed_up = False
+
+    def _ocr_document_pages(opened: Tuple[int, Iterator[Union[np.ndarray, str]], bool]) -> Iterator[str]:
+        """Texte de chaque page, dans l'ordre, au fil de l'OCR."""
+        nonlocal ocr, warmed_up
+        total_pages, images, rgb = opened
+
+        # --- Extraction du texte ---
+        # Pipeline : rendu PDF (thread A) → pré-traitement (threads B) → OCR (ici).
+        # PaddleOCR (moteur IA) : image brute (binarisation forte sur demande) ;
+        # Windows OCR : nettoyage léger.
+        if backend == "paddle" and args.aggressive_preprocess:
+            preprocess = functools.partial(_preprocess_heavy, opencl=opencl, rgb=rgb)
+        elif backend == "paddle":
+            preprocess = functools.partial(_preprocess_paddle, rgb=rgb)
         else:
-            # Windows OCR : essayer d'abord avec l'image légèrement nettoyée
-            cleaned = _preprocess_light(img)
-            if args.debug_images:
-                cv2.imwrite(f"cleaned_{idx}.png", cleaned)
-            extracted_pages.append(_windows_ocr_image_text(cleaned, lang))
-        print("OK")
+            preprocess = functools.partial(
+                _preprocess_light, denoise=args.denoise, opencl=opencl, rgb=rgb, cuda=cuda
+            )
+        cleaned_pages = _map_in_threads(
+            functools.partial(_preprocess_page, preprocess), _prefetch(images), _PREPROCESS_THREADS
+        )
+        if args.debug_images:
+            cleaned_pages = _save_debug_images(cleaned_pages)
+
+        # 0 = un seul lot pour tout le document
+        if args.batch_size <= 0:
+            batch_size = total_pages
+        else:
+            batch_size = args.batch_size
+        batches = _batched(cleaned_pages, batch_size)
+        # Mode service : l'instance déjà chargée sert à tous les documents
+        workers = 1 if args.serve else min(max(1, args.workers), -(-total_pages // batch_size))
+
+        done = 0
 
-    text = "\n\n".join([t for t in extracted_pages if t.strip()]).strip()
+        def _progress(n_pages: int) -> None:
+            first, last = done + 1, done + n_pages
+            if first == last:
+                print(f"[INFO] Traitement page {last}/{total_pages}...", end=" ", flush=True)
+            else:
+                print(f"[INFO] Traitement pages {first}-{last}/{total_pages}...", end=" ", flush=True)
+
+        if backend == "paddle" and workers > 1:
+            # Un PaddleOCR par processus : aucune instance dans le processus principal
+            print(f"[INFO] OCR réparti sur {workers} processus")
+            # Cœurs partagés entre processus
+            omp_threads = max(1, (os.cpu_count() or 1) // workers)
+            # "spawn" : un fork copierait un processus multi-thread (threads du pipeline
+            # en cours) et l'état déjà initialisé de Paddle
+            with ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_paddle_worker,
+                initargs=(paddle_lang, paddle_options, omp_threads),
+            ) as pool:
+                for n_pages, texts in _iter_pool_results(pool, _paddle_worker_pages, batches, 2 * workers):
+                    _progress(n_pages)
+                    print("OK")
+                    done += n_pages
+                    yield from texts
+        else:
+            if backend == "paddle" and ocr is None:
+                ocr = _create_paddle_ocr(paddle_lang, paddle_options)
+            if not warmed_up:
+                if backend == "paddle":
+                    _warm_up_paddle(ocr)
+                else:
+                    session.warm_up()
+                warmed_up = True
+            for batch in batches:
+                _progress(len(batch))
+                if backend == "paddle":
+                    texts = _ocr_with_text_pages(functools.partial(_paddle_ocr_pages, ocr), batch)
+                else:
+                    texts = _ocr_with_text_pages(session.ocr_images, batch)
+                print("OK")
+                done += len(batch)
+                yield from texts
+        _save_ocr_cache()
+
+    def _ocr_document(opened: Tuple[int, Iterator[Union[np.ndarray, str]], bool]) -> str:
+        return "\n\n".join([t for t in _ocr_document_pages(opened) if t.strip()]).strip()
+
+    text: Optional[str] = None
+    try:
+        if args.serve:
+            _serve(args, backend, _open, _ocr_document, results_out)
+            return 0
+        if not args.carbon:
+            # --- Mode OCR classique : chaque page est écrite dès qu'elle est reconnue ---
+            # (mémoire constante, et un document interrompu garde les pages déjà faites)
+            with open(output_path, "w", encoding="utf-8") as f:
+                sep = ""
+                for page_text in _ocr_document_pages(opened):
+                    page_text = page_text.strip()
+                    if page_text:
+                        f.write(sep + page_text)
+                        f.flush()
+                        sep = "\n\n"
+                f.write("\n")
+            # Le texte n'est pas gardé en mémoire : copie du fichier écrit (sans le \n final)
+            if cache_path is not None:
+                with open(output_path, encoding="utf-8") as f:
+                    text = f.read()[:-1]
+        else:
+            text = _ocr_document(opened)
+    finally:
+        if session is not None:
+            session.close()
+    if text is not None:
+        _store_document_cache(cache_path, text)
+    return _report(args, output_path, text)
 
+
+def _report(args: argparse.Namespace, output_path: str, text: Optional[str]) -> int:
+    """Sortie d'un document : JSON carbone (depuis `text`), ou texte déjà écrit dans `output_path`."""
     # --- Mode Carbone ---
     if args.carbon:
         print("\n[INFO] Analyse environnementale en cours...")
@@ -535,18 +1600,42 @@ def main(argv: Optional[List[str]] = None) -> int:
         print(f"\nDonnées JSON sauvegardées dans: {output_path}")
         return 0
 
-    # --- Mode OCR classique ---
-    print("\n===== TEXTE EXTRAIT =====\n")
-    print(text)
-
-    # --- Sauvegarde automatique ---
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(text)
-        f.write("\n")
+    if args.print_final:
+        print("\n===== TEXTE EXTRAIT =====\n")
+        with open(output_path, encoding="utf-8") as f:
+            shutil.copyfileobj(f, sys.stdout)
     print(f"\nTexte sauvegardé dans: {output_path}")
 
     return 0
 
 
+def _serve(args: argparse.Namespace, backend: str, open_document, ocr_document, results_out) -> None:
+    """Un document par ligne de stdin, une ligne JSON par document sur `results_out`.
+
+    Une entrée en erreur donne {"input", "erreur"} sans arrêter le service.
+    """
+    for line in sys.stdin:
+        input_path = line.strip()
+        if not input_path:
+            continue
+        try:
+            # Cache consulté d'abord : un document déjà traité n'est ni ouvert ni rendu
+            cache_path = _document_cache_path(input_path, args, backend)
+            text = _load_document_cache(cache_path)
+            if text is None:
+                text = ocr_document(open_document(input_path))
+                _store_document_cache(cache_path, text)
+        except (Exception, SystemExit) as exc:
+            result: Dict[str, object] = {"input": input_path, "erreur": str(exc)}
+        else:
+            if args.carbon:
+                result = {"input": input_path, **extraire_donnees_environnementales(text).to_dict()}
+                result["texte_ocr_brut"] = text
+            else:
+                result = {"input": input_path, "texte": text}
+        results_out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        results_out.flush()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Outils regex partagés par les extracteurs (extractor.py, extractor_v1.py)
+========================================================================
+
+  - compile_linear : RE2 (temps linéaire) si disponible et si le pattern s'y traduit, sinon `re`
+  - fuse_patterns / iter_by_pattern : plusieurs patterns balayés en une seule alternance
+  - lower_is_faithful : `text.lower()` utilisable à la place de re.IGNORECASE ?
+  - build_automaton : automate Aho–Corasick (pyahocorasick facultatif)
+  - portable_atomic : groupes atomiques `(?>…)` avant Python 3.11
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None  # type: ignore[assignment]
+
+try:
+    import re2
+except Exception:
+    re2 = None  # type: ignore[assignment]
+
+
+# ── RE2 (temps linéaire) ──
+# Sous RE2, \d et \s sont ASCII et « i » ne se replie pas sur « ı »/« İ » :
+# on les réécrit pour garder la sémantique de `re` (chiffres arabes-indiens,
+# espaces insécables…). \b et les assertions n'existent pas en RE2 ; un
+# pattern qui en contient reste sur `re`.
+_RE2_SPACE = r'\t-\r\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}'
+_RE2_DIGIT = r'\p{Nd}'
+_RE2_FOLD_I = 'iIıİ'
+
+
+def to_re2(pattern: str, ignorecase: bool) -> Optional[str]:
+    """Réécrit `pattern` pour RE2, ou None s'il utilise une construction non portable."""
+    out: List[str] = []
+    in_class = False
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            esc = pattern[i:i + 2]
+            if esc == r"\d":
+                out.append(_RE2_DIGIT)
+            elif esc == r"\s":
+                out.append(_RE2_SPACE if in_class else f"[{_RE2_SPACE}]")
+            elif esc == r"\u":
+                # Patterns écrits en \uXXXX : même caractère, syntaxe RE2
+                out.append(f"\\x{{{pattern[i + 2:i + 6]}}}")
+                i += 6
+                continue
+            elif esc[1:].isalnum():
+                # \b, \w, \D, \1… : sémantique différente ou absente en RE2
+                return None
+            else:
+                out.append(esc)
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+            out.append(_RE2_FOLD_I if ignorecase and c in "iI" else c)
+        elif c == "[":
+            in_class = True
+            out.append(c)
+            if pattern[i + 1:i + 2] == "]":
+                out.append("]")
+                i += 1
+        elif pattern.startswith("(?P<", i):
+            end = pattern.index(">", i)
+            out.append(pattern[i:end + 1])
+            i = end + 1
+            continue
+        elif pattern.startswith("(?>", i):
+            # RE2 ne revient jamais en arrière : un groupe atomique n'y change
+            # rien tant qu'il ne sert qu'à couper du backtracking inutile.
+            out.append("(?:")
+            i += 3
+            continue
+        elif pattern.startswith(("(?=", "(?!", "(?<"), i):
+            return None
+        elif ignorecase and c in "iI":
+            out.append(f"[{_RE2_FOLD_I}]")
+        else:
+            out.append(c)
+        i += 1
+    return ("(?i)" if ignorecase else "") + "".join(out)
+
+
+def compile_linear(pattern: str, flags: int = 0, as_bytes: bool = False):
+    """Compile via RE2 si disponible et si le pattern s'y traduit, sinon via `re`.
+
+    `as_bytes` : le motif RE2 porte sur le texte encodé en UTF-8 (recherches
+    répétées sans ré-encoder le texte à chaque appel).
+    """
+    if re2 is not None:
+        translated = to_re2(pattern, bool(flags & re.IGNORECASE))
+        if translated is not None:
+            try:
+                return re2.compile(translated.encode("utf-8") if as_bytes else translated)
+            except Exception:
+                pass
+    return re.compile(pattern, flags)
+
+
+def portable_atomic(pattern: str) -> str:
+    """`pattern`, ses groupes atomiques `(?>…)` ramenés à `(?:…)` avant Python 3.11.
+
+    `re` ne connaît `(?>` que depuis 3.11. Les extracteurs n'en mettent qu'autour
+    d'une suite de [\\d\\s.,] suivie d'une unité qui ne commence par aucun de ces
+    caractères : mêmes matches, seul le retour arrière évité est perdu.
+    """
+    if sys.version_info >= (3, 11):
+        return pattern
+    return pattern.replace("(?>", "(?:")
+
+
+# ── Alternances fusionnées ──
+
+def fuse_patterns(
+    patterns: List[str], flags: int = 0, as_bytes: bool = False, ranks: Optional[List[int]] = None
+) -> Tuple[re.Pattern, Dict[int, Tuple[int, int, int]]]:
+    """Fusionne des patterns en une alternance (?P<g0>…)|(?P<g1>…)|….
+
+    Renvoie la regex et, pour chaque groupe englobant, (rang du pattern,
+    1er groupe du pattern, groupe suivant son dernier). `ranks` : rangs à
+    utiliser à la place de 0, 1, 2…
+    """
+    rx = compile_linear("|".join(f"(?P<g{i}>{p})" for i, p in enumerate(patterns)), flags, as_bytes)
+    groupindex = {
+        (name.decode() if isinstance(name, bytes) else name): idx
+        for name, idx in rx.groupindex.items()
+    }
+    dispatch: Dict[int, Tuple[int, int, int]] = {}
+    for i, p in enumerate(patterns):
+        wrapper = groupindex[f"g{i}"]
+        rank = ranks[i] if ranks is not None else i
+        dispatch[wrapper] = (rank, wrapper + 1, wrapper + 1 + re.compile(p, flags).groups)
+    return rx, dispatch
+
+
+def iter_by_pattern(rx, dispatch: Dict[int, Tuple[int, int, int]], text: str) -> Iterator[tuple]:
+    """Mêmes groupes, dans le même ordre, que « pour chaque pattern : finditer ».
+
+    Un seul balayage : la recherche reprend juste après le début de chaque
+    match (les patterns peuvent se chevaucher entre eux) et chaque pattern
+    garde sa propre fin de match (ses matches à lui ne se chevauchent pas).
+    Exact tant que deux patterns ne peuvent pas matcher à la même position
+    avec des valeurs différentes. Les matches sont rendus dans l'ordre des
+    patterns, puis du texte : rend (rang du pattern, groupes).
+    """
+    as_bytes = isinstance(rx.pattern, bytes)
+    subject = text.encode("utf-8") if as_bytes else text
+    last_end: Dict[int, int] = {}
+    hits = []
+    pos = 0
+    while True:
+        m = rx.search(subject, pos)
+        if m is None:
+            break
+        # lastindex = groupe englobant g<i> (le dernier refermé)
+        key = m.lastindex
+        if m.start() >= last_end.get(key, 0):
+            last_end[key] = m.end()
+            hits.append((dispatch[key], m.groups()))
+        pos = m.start() + 1
+    hits.sort(key=lambda hit: hit[0][0])
+    for (rank, first, end), groups in hits:
+        groups = groups[first - 1:end - 1]
+        if as_bytes:
+            groups = tuple(None if g is None else g.decode("utf-8") for g in groups)
+        yield rank, groups
+
+
+# ── Minuscules ──
+# Caractères que re.IGNORECASE replie sur « i »/« s » mais que str.lower()
+# ne ramène pas à ces lettres (« İ » devient « i » + U+0307).
+_CASEFOLD_EXTRAS = ("ı", "ſ", "\u0307")
+
+
+def lower_is_faithful(text: str, text_lower: str) -> bool:
+    """Vrai si `text_lower` reflète les matches re.IGNORECASE de `text`, aux mêmes indices."""
+    return len(text_lower) == len(text) and not any(c in text_lower for c in _CASEFOLD_EXTRAS)
+
+
+# ── Aho–Corasick ──
+
+def build_automaton(pairs: Iterable[Tuple[str, object]]):
+    """Automate Aho–Corasick (mot → valeur), ou None sans pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, value in pairs:
+        automaton.add_word(word, value)
+    automaton.make_automaton()
+    return automaton
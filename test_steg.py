@@ -47,3 +47,23 @@ if d.get('detail_co2'):
     print("\n─── Détail CO₂ ───")
     for c in d['detail_co2']:
         print(f"  {c['type']:15s} : {c['consommation']} {c['unite']} × {c['facteur']} = {c['co2_kg']} kg")
+
+# Régression : index de compteur et volume sur deux lignes ne forment pas un seul nombre
+r_index = extraire_donnees_environnementales("Facture gaz naturel\nIndex 15441\n400 m3")
+volumes = [x.valeur for x in r_index.donnees if x.unite == "m³"]
+assert not volumes and r_index.emission_co2_kg is None, (volumes, r_index.emission_co2_kg)
+print(f"\nIndex + volume sur deux lignes : aucun volume ({volumes}), CO2 : {r_index.emission_co2_kg}")
+
+# batch_extraire (processus parallèles) : mêmes résultats, dans le même ordre, qu'un appel
+# par texte. Sous garde __main__ : avec "spawn" (Windows), chaque processus réimporte ce script.
+if __name__ == "__main__":
+    import extractor
+    from extractor import batch_extraire
+
+    samples = [text, "Facture gaz naturel\nIndex 15441\n400 m3", text.replace("400", "512"), ""]
+    sequential = [extraire_donnees_environnementales(t).to_dict() for t in samples]
+    # Cache vidé : les processus (fork) recalculent au lieu de recopier les résultats du parent
+    extractor._RESULT_CACHE.clear()
+    batched = [res.to_dict() for res in batch_extraire(samples, workers=2)]
+    assert batched == sequential, [i for i, (a, b) in enumerate(zip(batched, sequential)) if a != b]
+    print(f"batch_extraire : {len(batched)} textes identiques à l'extraction séquentielle")